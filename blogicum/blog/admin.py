@@ -5,16 +5,58 @@ admin.ModelAdmin, в унаследованном классе переопре
 """
 
 
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import F
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageJob, Location, Post
+from .paginators import EstimatedCountPaginator
+from .search import search_posts
+
+
+class RowAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которое показывает уже загруженный объект строки.
+    Стандартный виджет выбирает отмеченный вариант отдельным запросом,
+    что в списке с list_editable дает по запросу на строку.
+    """
+
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        obj = self.selected_object
+        if obj is None or [str(v) for v in value] != [str(obj.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj),
+            True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class ChangelistRowForm(forms.ModelForm):
+    """Форма строки списка: связанные объекты берутся из самой строки."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, RowAutocompleteSelect):
+                widget.selected_object = getattr(self.instance, name)
 
 
 class PostAdmin(admin.ModelAdmin):
     """Отображение модели Post.
     list_display - поля которые будут отображаться;
-    list_editable - редактируемые поля; search_fields - поиск по полю;
-    list_filter - фильтр; list_display_links - ссылка переход.
+    list_editable - редактируемые поля; search_fields - поиск по полю
+    (выполняется по полнотекстовому индексу); list_filter - фильтр;
+    list_display_links - ссылка переход. Связанные объекты загружаются
+    одним запросом, внешние ключи выбираются через автодополнение, а
+    количество строк без фильтров берется из статистики СУБД.
     """
 
     list_display = (
@@ -33,6 +75,43 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     list_filter = ('category',)
     list_display_links = ('title',)
+    list_select_related = ('author', 'location', 'category')
+    autocomplete_fields = ('author', 'location', 'category')
+    date_hierarchy = 'pub_date'
+    ordering = ('-pub_date', '-pk')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', RowAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', ChangelistRowForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_ordering(self, request):
+        """При поиске строки по умолчанию идут по релевантности.
+        search_rank добавляется в get_search_results, а выражение F
+        разрешается уже в итоговом запросе списка.
+        """
+        if request.GET.get(SEARCH_VAR):
+            return (F('search_rank').desc(), '-pub_date', '-pk')
+        return super().get_ordering(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по индексу с сохранением порядка, выбранного списком:
+        по релевантности или по столбцу, который выбрал пользователь.
+        """
+        if not search_term:
+            return queryset, False
+        results = search_posts(queryset, search_term)
+        if queryset.query.order_by:
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -71,7 +150,24 @@ class CommentAdmin(admin.ModelAdmin):
     )
 
 
+class ImageJobAdmin(admin.ModelAdmin):
+    """Отображение очереди обработки изображений."""
+
+    list_display = (
+        'image_name',
+        'result_name',
+        'post',
+        'status',
+        'attempts',
+        'created_at',
+        'finished_at'
+    )
+    list_filter = ('status',)
+    raw_id_fields = ('post',)
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,60 @@
+"""Версии кэшированных фрагментов и страниц.
+Каждой записи (пост, категория, местоположение, пользователь) соответствует
+токен версии в кэше. Токен входит в ключ фрагмента, поэтому при изменении
+записи достаточно заменить токен: старые фрагменты просто перестают
+использоваться и вытесняются по таймауту. Общая версия лент сбрасывается при
+любом изменении контента и входит в ключ кэша страниц целиком.
+"""
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+VERSION_KEY = 'version:{}:{}'
+PAGE_KEY = 'page:{}:{}'
+FEED = ('feed', 'all')
+CACHE_ALIAS = 'blog'
+
+cache = ConnectionProxy(caches, CACHE_ALIAS)
+
+
+def version_key(name, pk):
+    return VERSION_KEY.format(name, pk)
+
+
+def new_token():
+    """Случайный токен; после вытеснения из кэша версия не повторится."""
+    return uuid4().hex[:12]
+
+
+def get_versions(*keys):
+    """Токены версий для пар (имя, pk) одним обращением к кэшу."""
+    cache_keys = [version_key(name, pk) for name, pk in keys]
+    versions = cache.get_many(cache_keys)
+    for cache_key in cache_keys:
+        if cache_key not in versions:
+            token = new_token()
+            if not cache.add(cache_key, token, timeout=None):
+                token = cache.get(cache_key, token)
+            versions[cache_key] = token
+    return ':'.join(versions[cache_key] for cache_key in cache_keys)
+
+
+def bump_version(name, pk):
+    """Сброс всех фрагментов, зависящих от записи."""
+    cache.set(version_key(name, pk), new_token(), timeout=None)
+
+
+def bump_feed_version():
+    """Сброс кэша страниц лент."""
+    bump_version(*FEED)
+
+
+def page_cache_key(path, params):
+    """Ключ страницы: версия лент, путь и параметры запроса в порядке
+    имен.
+    """
+    url = path + '?' + urlencode(sorted(params.items()))
+    return PAGE_KEY.format(get_versions(FEED), md5(url.encode()).hexdigest())
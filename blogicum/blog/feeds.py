@@ -0,0 +1,223 @@
+"""Ленты RSS и Atom: общая, по категории и по автору.
+Посты выбираются через sql_filters и читаются iterator(), а XML
+отдается StreamingHttpResponse по одному элементу, поэтому память не
+растет с размером ленты. Тело ленты целиком кэшируется после отправки.
+Ключ кэша и ETag строятся из токенов версий (см. blog.cache): ленту
+сбрасывает изменение поста в ее области, категории или автора, а также
+наступление отложенной публикации. Формат Atom выбирается параметром
+?format=atom, по умолчанию отдается RSS 2.0.
+"""
+from hashlib import md5
+from io import StringIO
+from itertools import chain
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import require_safe
+
+from blog.cache import cache, get_versions
+from blog.models import Category, Post
+from blog.utils import cached_next_publication, sql_filters
+
+User = get_user_model()
+
+FEED_BODY_KEY = 'feed-body:{}'
+DEFAULT_FEED_ITEMS = 50
+ITERATOR_CHUNK_SIZE = 100
+ENCODING = 'utf-8'
+
+
+class StreamingFeedMixin:
+    """Потоковая запись ленты feedgenerator.
+    items - ленивый итератор аргументов add_item; дата последнего
+    обновления передается заранее, так как заголовок ленты пишется до
+    элементов. Корневые элементы открывает start_document и закрывает
+    end_document ленты конкретного формата.
+    """
+
+    item_element = 'item'
+
+    def __init__(self, *args, latest_date=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latest_date = latest_date
+
+    def latest_post_date(self):
+        return self.latest_date or timezone.now()
+
+    def make_item(self, **kwargs):
+        """Словарь элемента в том виде, в каком его строит add_item."""
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    def stream(self, entries):
+        """Части XML-документа по мере записи элементов."""
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(
+            buffer, ENCODING, short_empty_elements=True
+        )
+
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        handler.startDocument()
+        self.start_document(handler)
+        yield flush()
+        for entry in entries:
+            item = self.make_item(**entry)
+            handler.startElement(self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield flush()
+        self.end_document(handler)
+        yield flush()
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+
+    def start_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+
+    item_element = 'entry'
+
+    def start_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def feed_items():
+    return getattr(settings, 'BLOG_FEED_ITEMS', DEFAULT_FEED_ITEMS)
+
+
+def feed_entries(request, posts):
+    """Аргументы add_item для каждого поста queryset."""
+    for post in posts.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        link = request.build_absolute_uri(
+            reverse('blog:post_detail', args=(post.pk,))
+        )
+        yield {
+            'title': post.title,
+            'link': link,
+            'description': post.text,
+            'unique_id': link,
+            'pubdate': post.pub_date,
+            'author_name': post.author.username,
+            'categories': (post.category.title,),
+        }
+
+
+def cache_feed(key, chunks):
+    """Передача частей ленты с сохранением тела в кэш после последней."""
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(body))
+
+
+def feed_response(request, title, link, posts, versions):
+    """Ответ с лентой постов queryset.
+    versions - пары (имя, pk) токенов, от которых зависит лента.
+    """
+    feed_type = 'atom' if request.GET.get('format') == 'atom' else 'rss'
+    feed_class = FEED_TYPES[feed_type]
+    etag = '"%s"' % md5(':'.join((
+        feed_type,
+        request.get_host(),
+        get_versions(*versions),
+        cached_next_publication(),
+    )).encode()).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    key = FEED_BODY_KEY.format(etag.strip('"'))
+    body = cache.get(key)
+    if body is not None:
+        response = HttpResponse(body, content_type=feed_class.content_type)
+    else:
+        posts = sql_filters(
+            posts.select_related('category', 'author')
+        ).order_by('-pub_date')[:feed_items()]
+        entries = feed_entries(request, posts)
+        first = next(entries, None)
+        feed = feed_class(
+            title=title,
+            link=request.build_absolute_uri(link),
+            description=title,
+            feed_url=request.build_absolute_uri(),
+            language=settings.LANGUAGE_CODE,
+            latest_date=first and first['pubdate'],
+        )
+        entries = chain([first], entries) if first else entries
+        response = StreamingHttpResponse(
+            cache_feed(key, feed.stream(entries)),
+            content_type=feed_class.content_type,
+        )
+    response['ETag'] = etag
+    return response
+
+
+@require_safe
+def site_feed(request):
+    """Лента всех опубликованных постов."""
+    return feed_response(
+        request, 'Блогикум', reverse('blog:index'), Post.objects.all(),
+        [('post', 'all'), ('category', 'all'), ('user', 'all')],
+    )
+
+
+@require_safe
+def category_feed(request, category_slug):
+    """Лента постов опубликованной категории."""
+    category = get_object_or_404(
+        Category.objects.only('pk', 'title'),
+        slug=category_slug, is_published=True
+    )
+    return feed_response(
+        request, f'Блогикум: {category.title}',
+        reverse('blog:category_posts', args=(category_slug,)),
+        Post.objects.filter(category=category),
+        [('category-posts', category.pk), ('category', category.pk),
+         ('user', 'all')],
+    )
+
+
+@require_safe
+def profile_feed(request, username):
+    """Лента опубликованных постов автора."""
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return feed_response(
+        request, f'Блогикум: @{username}',
+        reverse('blog:profile', args=(username,)),
+        Post.objects.filter(author=author),
+        [('author-posts', author.pk), ('user', author.pk),
+         ('category', 'all')],
+    )
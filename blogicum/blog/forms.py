@@ -3,6 +3,16 @@ from django import forms
 from .models import Comment, Post
 
 
+class StreamedImageField(forms.ImageField):
+    """Поле изображения, принимающее ошибки потоковой загрузки."""
+
+    def to_python(self, data):
+        upload_error = getattr(data, 'upload_error', None)
+        if upload_error:
+            raise forms.ValidationError(upload_error, code='invalid_image')
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
     """Форма для создания поста"""
 
@@ -10,6 +20,7 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = '__all__'
         exclude = ('author', )
+        field_classes = {'image': StreamedImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
@@ -0,0 +1,141 @@
+"""Обработка изображений постов.
+Оригинал поворачивается по EXIF, очищается от метаданных и перекодируется.
+Рядом с ним сохраняются копии фиксированной ширины в форматах WebP и JPEG;
+шаблоны отдают их через srcset, чтобы карточка шириной 40rem не загружала
+исходный файл целиком. Имена копий выводятся из имени оригинала, поэтому для
+построения srcset не нужно обращаться к диску.
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True,
+             'progressive': True},
+}
+
+# Форматы оригиналов, которые перекодируются; остальные (например,
+# анимированный GIF) сохраняются как есть
+ORIGINAL_FORMATS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+KEPT_INFO = ('icc_profile', 'transparency')
+
+
+def variant_name(name, width, extension):
+    """posts_images/photo.png -> posts_images/photo_w640.webp"""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_w{width}.{extension}'))
+
+
+def variant_names(name):
+    return [
+        variant_name(name, width, extension)
+        for width in VARIANT_WIDTHS
+        for extension in VARIANT_FORMATS
+    ]
+
+
+def srcset(image, extension):
+    """Значение атрибута srcset для готовых копий изображения."""
+    return ', '.join(
+        f'{image.storage.url(variant_name(image.name, width, extension))} '
+        f'{width}w'
+        for width in VARIANT_WIDTHS
+    )
+
+
+def render_variants(source):
+    """Копии изображения: {(ширина, расширение): байты}.
+    Изображение не увеличивается: если оригинал уже исходной ширины,
+    копия сохраняется в его размере.
+    """
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+    variants = {}
+    for width in VARIANT_WIDTHS:
+        resized = image
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+        for extension, options in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, **options)
+            variants[width, extension] = buffer.getvalue()
+    return variants
+
+
+def overwrite(storage, name, content):
+    """Запись файла под именем name с заменой существующего."""
+    if hasattr(storage, 'overwrite'):
+        return storage.overwrite(name, content)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def generate_variants(name, storage=default_storage):
+    """Создание копий для файла name в хранилище; возвращает их имена."""
+    with storage.open(name, 'rb') as source:
+        variants = render_variants(source)
+    saved = []
+    for (width, extension), content in variants.items():
+        target = variant_name(name, width, extension)
+        saved.append(overwrite(storage, target, ContentFile(content)))
+    return saved
+
+
+def normalize_original(name, storage=default_storage):
+    """Поворот по EXIF, удаление метаданных и перекодирование оригинала.
+    Результат сохраняется новым файлом (в хранилище с адресацией по
+    содержимому - под хэшем новых байтов), исходный файл не меняется.
+    Возвращает имя обработанного файла или name, если формат не
+    перекодируется.
+    """
+    with storage.open(name, 'rb') as source:
+        with Image.open(source) as image:
+            image_format = image.format
+            if image_format not in ORIGINAL_FORMATS:
+                return name
+            image = ImageOps.exif_transpose(image)
+    image.info = {
+        key: value for key, value in image.info.items() if key in KEPT_INFO
+    }
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **ORIGINAL_FORMATS[image_format])
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def process_image(name, storage=default_storage):
+    """Полная обработка загруженного изображения.
+    Возвращает имя обработанного оригинала, для которого созданы копии.
+    """
+    name = normalize_original(name, storage)
+    generate_variants(name, storage)
+    return name
+
+
+def delete_variants(name, storage=default_storage):
+    for target in variant_names(name):
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def delete_image(name, storage=default_storage):
+    """Удаление оригинала вместе с копиями; возвращает освобожденные байты."""
+    freed = 0
+    for target in (name, *variant_names(name)):
+        if storage.exists(target):
+            freed += storage.size(target)
+            storage.delete(target)
+    return freed
@@ -0,0 +1,134 @@
+"""Очередь обработки изображений в базе данных.
+Задание захватывается условным UPDATE по статусу, поэтому несколько
+воркеров могут работать с одной очередью без блокировок строк и на любой
+СУБД, включая SQLite. Файл изображения может быть общим для нескольких
+постов, поэтому обрабатывается один раз. Обработанный оригинал
+сохраняется под новым именем (см. blog.images.normalize_original), и все
+посты, ссылавшиеся на исходный файл, переводятся на него.
+"""
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blog.cache import bump_feed_version, bump_version
+from blog.images import process_image
+from blog.models import ImageJob, Post
+from blog.utils import collect_orphan_image
+
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=10)
+
+
+def processed_name(name):
+    """Имя готового обработанного файла для загруженного name или None.
+    Готов сам name или результат выполненного для него задания, если на
+    результат ссылается пост с созданными копиями.
+    """
+    results = ImageJob.objects.filter(
+        image_name=name, status=ImageJob.DONE
+    ).values('result_name')
+    return Post.objects.filter(
+        Q(image=name) | Q(image__in=results),
+        image_variants_name=F('image')
+    ).values_list('image', flat=True).first()
+
+
+def enqueue_image_job(post):
+    """Постановка изображения поста в очередь.
+    При BLOG_PROCESS_IMAGES_INLINE задание выполняется сразу, в текущем
+    процессе (удобно для разработки без воркера). Если тот же файл уже
+    обработан или ждет обработки для другого поста, задание не создается.
+    """
+    name = post.image.name
+    processed = processed_name(name)
+    if processed is not None:
+        Post.objects.filter(pk=post.pk).update(
+            image=processed, image_variants_name=processed
+        )
+        post.image.name = post.image_variants_name = processed
+        if processed != name:
+            transaction.on_commit(partial(collect_orphan_image, name))
+        return None
+    job = ImageJob.objects.filter(
+        image_name=name, status__in=(ImageJob.PENDING, ImageJob.RUNNING)
+    ).first()
+    if job is not None:
+        return job
+    job = ImageJob.objects.create(post=post, image_name=name)
+    if getattr(settings, 'BLOG_PROCESS_IMAGES_INLINE', False):
+        if claim_job(job):
+            run_job(job)
+            post.refresh_from_db(fields=('image', 'image_variants_name'))
+    return job
+
+
+def claim_job(job):
+    """Захват задания; False, если его уже взял другой воркер."""
+    now = timezone.now()
+    claimed = ImageJob.objects.filter(
+        Q(status=ImageJob.PENDING)
+        | Q(status=ImageJob.RUNNING, started_at__lt=now - STALE_AFTER),
+        pk=job.pk,
+        started_at=job.started_at
+    ).update(
+        status=ImageJob.RUNNING,
+        started_at=now,
+        attempts=F('attempts') + 1
+    )
+    if claimed:
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+def claim_next_job():
+    """Следующее задание из очереди или None."""
+    stale = timezone.now() - STALE_AFTER
+    candidates = ImageJob.objects.filter(
+        Q(status=ImageJob.PENDING)
+        | Q(status=ImageJob.RUNNING, started_at__lt=stale)
+    ).order_by('created_at')
+    for job in candidates[:10]:
+        if claim_job(job):
+            return job
+    return None
+
+
+def run_job(job):
+    """Выполнение задания и фиксация результата."""
+    posts = Post.objects.filter(image=job.image_name)
+    post = posts.first()
+    if post is None:
+        # Изображение заменили или пост удалили, пока задание ждало
+        return finish_job(job, ImageJob.DONE)
+    try:
+        name = process_image(job.image_name, post.image.storage)
+    except Exception as error:
+        status = (
+            ImageJob.FAILED if job.attempts >= MAX_ATTEMPTS
+            else ImageJob.PENDING
+        )
+        return finish_job(job, status, error=repr(error))
+    pks = list(posts.values_list('pk', flat=True))
+    posts.update(image=name, image_variants_name=name)
+    for pk in pks:
+        bump_version('post', pk)
+    bump_feed_version()
+    if name != job.image_name:
+        # Исходный файл с метаданными больше не нужен
+        transaction.on_commit(partial(collect_orphan_image, job.image_name))
+    job.result_name = name
+    return finish_job(job, ImageJob.DONE)
+
+
+def finish_job(job, status, error=''):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=('status', 'error', 'finished_at', 'result_name')
+    )
+    return job
@@ -0,0 +1,34 @@
+"""Статистика попаданий и промахов кэша по алиасам."""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Выводит счетчики попаданий и промахов для каждого алиаса кэша.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Алиасы кэша; по умолчанию все из настройки CACHES.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счетчики после вывода.'
+        )
+
+    def handle(self, *args, aliases, reset, **options):
+        for alias in aliases or settings.CACHES:
+            cache = caches[alias]
+            if not hasattr(cache, 'get_stats'):
+                self.stdout.write(f'{alias}: бэкенд не ведет статистику')
+                continue
+            stats = cache.get_stats()
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            self.stdout.write(
+                f'{alias}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]}, доля попаданий {ratio:.1%}'
+            )
+            if reset:
+                cache.reset_stats()
@@ -0,0 +1,83 @@
+"""Удаление файлов изображений, на которые не ссылается ни один пост."""
+import posixpath
+import re
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from blog.images import VARIANT_FORMATS, VARIANT_WIDTHS
+from blog.models import Post
+
+DEFAULT_MIN_AGE = 3600
+VARIANT_SUFFIX = re.compile(
+    r'_w(?:{})\.(?:{})$'.format(
+        '|'.join(map(str, VARIANT_WIDTHS)), '|'.join(VARIANT_FORMATS)
+    )
+)
+
+
+def walk(storage, directory):
+    """Имена всех файлов каталога хранилища, включая вложенные."""
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from walk(storage, posixpath.join(directory, subdirectory))
+
+
+def source_stem(name):
+    """Имя оригинала без расширения: для копии - имя ее оригинала."""
+    return posixpath.splitext(VARIANT_SUFFIX.sub('', name))[0]
+
+
+class Command(BaseCommand):
+    help = ('Удаляет файлы изображений постов, на которые нет ссылок, и '
+            'выводит объем освобожденного места.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать файлы, ничего не удаляя.'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=DEFAULT_MIN_AGE,
+            help=('Не трогать файлы моложе указанного числа секунд: они '
+                  'могут принадлежать еще не сохраненному посту.')
+        )
+
+    def handle(self, *args, dry_run, min_age, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        directory = str(field.upload_to)
+        if not storage.exists(directory):
+            self.stdout.write('Каталог изображений пуст.')
+            return
+        referenced = {
+            posixpath.splitext(name)[0]
+            for name in Post.objects.exclude(image='').values_list(
+                'image', flat=True).iterator()
+        }
+        newer_than = timezone.now() - timedelta(seconds=min_age)
+        removed = freed = 0
+        lock = getattr(storage, 'lock', None)
+        for name in walk(storage, directory):
+            if source_stem(name) in referenced:
+                continue
+            # Повторная загрузка файла обновляет время его изменения (см.
+            # ContentAddressedStorage.save); проверка и удаление - под той же
+            # блокировкой
+            with lock(name) if lock else nullcontext():
+                if storage.get_modified_time(name) > newer_than:
+                    continue
+                freed += storage.size(name)
+                removed += 1
+                if not dry_run:
+                    storage.delete(name)
+        if dry_run:
+            message = f'Можно удалить файлов: {removed}, освободится: '
+        else:
+            message = f'Удалено файлов: {removed}, освобождено: '
+        self.stdout.write(self.style.SUCCESS(message + filesizeformat(freed)))
@@ -0,0 +1,69 @@
+"""Создание уменьшенных копий для уже загруженных изображений постов."""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F
+
+from blog.cache import bump_feed_version, bump_version
+from blog.images import generate_variants
+from blog.models import Post
+
+
+def generate_post_variants(name):
+    """Копии файла name в хранилище поля Post.image.
+    Хранилище берется в дочернем процессе: передавать его между
+    процессами не нужно.
+    """
+    return generate_variants(name, Post._meta.get_field('image').storage)
+
+
+class Command(BaseCommand):
+    help = ('Создает копии изображений постов, у которых их еще нет, '
+            'параллельно в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Количество процессов.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для уже обработанных изображений.'
+        )
+
+    def handle(self, *args, workers, force, **options):
+        posts = Post.objects.exclude(image='')
+        if not force:
+            posts = posts.exclude(image_variants_name=F('image'))
+        pending = list(posts.values_list('pk', 'image'))
+        # Соединения с базой не должны наследоваться дочерними процессами
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as executor:
+            futures = {
+                executor.submit(generate_post_variants, name): (pk, name)
+                for pk, name in pending
+            }
+            for future in as_completed(futures):
+                pk, name = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'Пост {pk}, файл {name}: {error}')
+                    continue
+                Post.objects.filter(pk=pk, image=name).update(
+                    image_variants_name=name
+                )
+                bump_version('post', pk)
+                done += 1
+        if done:
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {done}, с ошибками: {failed}'
+        ))
@@ -0,0 +1,25 @@
+"""Генерация файлов карты сайта."""
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import generate_sitemaps
+
+
+class Command(BaseCommand):
+    help = ('Дописывает в карту сайта посты, категории и профили, '
+            'появившиеся с прошлого запуска, и перезаписывает файлы, '
+            'записи которых изменились.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help=('Сгенерировать все файлы заново, убрав снятые с '
+                  'публикации записи.')
+        )
+
+    def handle(self, *args, full, **options):
+        added = generate_sitemaps(full)
+        self.stdout.write(self.style.SUCCESS(
+            'Записано адресов: ' + ', '.join(
+                f'{name} - {count}' for name, count in added.items()
+            )
+        ))
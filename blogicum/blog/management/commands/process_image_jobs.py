@@ -0,0 +1,41 @@
+"""Воркер очереди обработки изображений постов."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.jobs import claim_next_job, run_job
+from blog.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает загруженные изображения постов: поворот по EXIF, '
+            'удаление метаданных, перекодирование и уменьшенные копии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать текущую очередь и завершиться.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунды.'
+        )
+
+    def handle(self, *args, once, sleep, **options):
+        processed = 0
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    break
+                time.sleep(sleep)
+                continue
+            job = run_job(job)
+            processed += 1
+            if job.status == ImageJob.FAILED:
+                self.stderr.write(f'{job}: {job.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано заданий: {processed}'
+        ))
@@ -0,0 +1,38 @@
+"""Публикация отложенных постов, время которых наступило."""
+from django.core.management.base import BaseCommand
+
+from blog.publishing import (DEFAULT_MAX_SLEEP, publish_due_posts,
+                             run_publisher)
+
+
+class Command(BaseCommand):
+    help = ('Делает видимыми отложенные посты, дата публикации которых '
+            'наступила. Без --loop выполняется один раз (например, из '
+            'cron), с --loop работает как воркер и просыпается к дате '
+            'ближайшей публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help=('Работать постоянно, публикуя посты в момент наступления '
+                  'даты.')
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=DEFAULT_MAX_SLEEP,
+            help=('Наибольшая пауза воркера, секунды: за это время замечаются '
+                  'новые отложенные посты.')
+        )
+
+    def report(self, published):
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликовано постов: {len(published)}'
+        ))
+
+    def handle(self, *args, loop, max_sleep, **options):
+        if not loop:
+            self.report(publish_due_posts())
+            return
+        try:
+            run_publisher(max_sleep, on_publish=self.report)
+        except KeyboardInterrupt:
+            pass
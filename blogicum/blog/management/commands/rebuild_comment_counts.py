@@ -0,0 +1,35 @@
+"""Пересчет денормализованного счетчика комментариев у постов."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.utils import recount_comments
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество постов, обновляемых в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                    'pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += recount_comments(Post.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено постов: {updated}')
+        )
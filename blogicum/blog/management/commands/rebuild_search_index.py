@@ -0,0 +1,24 @@
+"""Перестроение полнотекстового индекса постов."""
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import DEFAULT_BATCH_SIZE, prune_index, reindex_posts
+
+
+class Command(BaseCommand):
+    help = ('Заново индексирует заголовки, тексты и категории всех постов. '
+            'Поиск продолжает работать во время перестроения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество постов, индексируемых в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        indexed = reindex_posts(Post.objects.all(), batch_size)
+        pruned = prune_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed}, удалено лишних строк: '
+            f'{pruned}'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants_name',
+            field=models.CharField(blank=True, editable=False, help_text='Изображение, для которого созданы уменьшенные копии.', max_length=100, verbose_name='Копии изображения'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SCHEMA = {
+    'sqlite': {
+        'create': (
+            "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')",
+        ),
+        'drop': ('DROP TABLE IF EXISTS blog_post_search',),
+    },
+    'postgresql': {
+        'create': (
+            "CREATE TABLE blog_post_search ("
+            "rowid bigint PRIMARY KEY REFERENCES blog_post (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "title text NOT NULL, "
+            "text text NOT NULL, "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('russian', title), 'A') || "
+            "setweight(to_tsvector('russian', text), 'B')) STORED)",
+            "CREATE INDEX blog_post_search_document_idx "
+            "ON blog_post_search USING GIN (document)",
+        ),
+        'drop': ('DROP TABLE IF EXISTS blog_post_search',),
+    },
+}
+
+
+def run_schema(action):
+    def run(apps, schema_editor):
+        statements = SCHEMA.get(schema_editor.connection.vendor)
+        if statements is None:
+            return
+        for sql in statements[action]:
+            schema_editor.execute(sql)
+    return run
+
+
+def fill_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in SCHEMA:
+        return
+    Post = apps.get_model('blog', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            Post.objects.values_list('id', 'title', 'text').iterator()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.post', verbose_name='Пост')),
+                ('title', models.TextField(verbose_name='Заголовок')),
+                ('text', models.TextField(verbose_name='Текст')),
+            ],
+            options={
+                'verbose_name': 'поисковый индекс',
+                'verbose_name_plural': 'Поисковый индекс',
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(run_schema('create'), run_schema('drop')),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,151 @@
+import re
+
+import snowballstemmer
+from django.db import migrations, models
+
+# Копия разбора текста из blog.tokenizer на момент миграции: индекс должен
+# строиться одинаково, как бы ни менялся модуль приложения
+WORD_RE = re.compile(r'\w+')
+STEMMERS = {}
+
+
+def stem(word):
+    word = word.casefold().replace('ё', 'е')
+    language = 'english' if word.isascii() else 'russian'
+    if language not in STEMMERS:
+        STEMMERS[language] = snowballstemmer.stemmer(language)
+    return STEMMERS[language].stemWord(word)
+
+
+def index_tokens(text):
+    return ' '.join(stem(word) for word in WORD_RE.findall(text or ''))
+
+
+# Схема индекса из 0012_post_search_index для отката
+PREVIOUS_SCHEMA = {
+    'sqlite': {
+        'create': (
+            "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')",
+        ),
+    },
+    'postgresql': {
+        'create': (
+            "CREATE TABLE blog_post_search ("
+            "rowid bigint PRIMARY KEY REFERENCES blog_post (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "title text NOT NULL, "
+            "text text NOT NULL, "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('russian', title), 'A') || "
+            "setweight(to_tsvector('russian', text), 'B')) STORED)",
+            "CREATE INDEX blog_post_search_document_idx "
+            "ON blog_post_search USING GIN (document)",
+        ),
+    },
+}
+
+SCHEMA = {
+    'sqlite': {
+        'create': (
+            "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+            "title_tokens, text_tokens, category_tokens, "
+            "tokenize = 'unicode61 remove_diacritics 0')",
+        ),
+        'drop': ('DROP TABLE IF EXISTS blog_post_search',),
+    },
+    'postgresql': {
+        'create': (
+            "CREATE TABLE blog_post_search ("
+            "rowid bigint PRIMARY KEY REFERENCES blog_post (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "title_tokens text NOT NULL, "
+            "text_tokens text NOT NULL, "
+            "category_tokens text NOT NULL, "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', title_tokens), 'A') || "
+            "setweight(to_tsvector('simple', category_tokens), 'B') || "
+            "setweight(to_tsvector('simple', text_tokens), 'C')) STORED)",
+            "CREATE INDEX blog_post_search_document_idx "
+            "ON blog_post_search USING GIN (document)",
+        ),
+        'drop': ('DROP TABLE IF EXISTS blog_post_search',),
+    },
+}
+
+
+def rebuild_index(apps, schema_editor):
+    """Пересоздание индекса с основами слов вместо исходного текста."""
+    statements = SCHEMA.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements['drop'] + statements['create']:
+        schema_editor.execute(sql)
+    Post = apps.get_model('blog', 'Post')
+    rows = (
+        (pk, index_tokens(title), index_tokens(text),
+         index_tokens(category or ''))
+        for pk, title, text, category in Post.objects.values_list(
+            'id', 'title', 'text', 'category__title').iterator()
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_search '
+            '(rowid, title_tokens, text_tokens, category_tokens) '
+            'VALUES (%s, %s, %s, %s)',
+            rows
+        )
+
+
+def restore_index(apps, schema_editor):
+    """Возврат индекса по исходному тексту заголовка и текста."""
+    statements = SCHEMA.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    previous = PREVIOUS_SCHEMA[schema_editor.connection.vendor]
+    for sql in statements['drop'] + previous['create']:
+        schema_editor.execute(sql)
+    Post = apps.get_model('blog', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            Post.objects.values_list('id', 'title', 'text').iterator()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='postsearchindex',
+            name='title',
+        ),
+        migrations.RemoveField(
+            model_name='postsearchindex',
+            name='text',
+        ),
+        migrations.AddField(
+            model_name='postsearchindex',
+            name='title_tokens',
+            field=models.TextField(default='', verbose_name='Основы слов заголовка'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='postsearchindex',
+            name='text_tokens',
+            field=models.TextField(default='', verbose_name='Основы слов текста'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='postsearchindex',
+            name='category_tokens',
+            field=models.TextField(default='', verbose_name='Основы слов категории'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(rebuild_index, restore_index),
+    ]
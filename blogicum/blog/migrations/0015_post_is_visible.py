@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:02
+
+from django.db import migrations, models
+from django.db.models import Case, Exists, OuterRef, Value, When
+from django.utils import timezone
+
+
+def fill_is_visible(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Category = apps.get_model('blog', 'Category')
+    Post.objects.update(is_visible=Case(
+        When(
+            Exists(Category.objects.filter(
+                pk=OuterRef('category_id'), is_published=True
+            )),
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            then=Value(True),
+        ),
+        default=Value(False),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_visible_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Виден в лентах'),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-pub_date'], name='post_visible_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_visible', False)), fields=['pub_date'], name='post_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# На PostgreSQL строка индекса удаляется каскадом по внешнему ключу rowid,
+# виртуальная таблица FTS5 внешних ключей не поддерживает
+TRIGGER = {
+    'sqlite': {
+        'create': (
+            "CREATE TRIGGER blog_post_search_delete AFTER DELETE ON blog_post "
+            "BEGIN DELETE FROM blog_post_search WHERE rowid = OLD.id; END",
+        ),
+        'drop': ('DROP TRIGGER IF EXISTS blog_post_search_delete',),
+    },
+}
+
+
+def run_trigger(action):
+    def run(apps, schema_editor):
+        statements = TRIGGER.get(schema_editor.connection.vendor)
+        if statements is None:
+            return
+        for sql in statements[action]:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_published_feed_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_trigger('create'), run_trigger('drop')),
+    ]
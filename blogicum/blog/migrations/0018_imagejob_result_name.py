@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_search_delete_trigger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='result_name',
+            field=models.CharField(blank=True, help_text='Обработанный файл, на который переведены посты.', max_length=100, verbose_name='Результат'),
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['image_name'], name='imagejob_image_idx'),
+        ),
+    ]
@@ -1,8 +1,25 @@
 """Дополнительные миксины."""
+from functools import partial
+from hashlib import md5
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
 from django.urls import reverse
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from blog.cache import FEED, cache, get_versions, page_cache_key
 from blog.models import Comment
+from blog.paginators import KeysetPaginator
+from blog.uploads import PostImageUploadHandler
+from blog.utils import cached_next_publication, seconds_until_next_publication
+
+DEFAULT_PAGE_CACHE_TIMEOUT = 300
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -24,3 +41,146 @@ class CommentMixin:
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class StreamingImageUploadMixin:
+    """Миксин потоковой загрузки изображения поста.
+    Обработчик нужно подключить до разбора тела запроса, а
+    CsrfViewMiddleware читает request.POST раньше представления, поэтому
+    проверка CSRF перенесена внутрь dispatch. Миксин должен стоять первым
+    в списке базовых классов.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers.insert(0, PostImageUploadHandler(request))
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class KeysetPaginationMixin:
+    """Миксин постраничной навигации по ключу для ListView.
+    Если keyset_pagination не задан в представлении, режим берется из
+    настройки BLOG_KEYSET_PAGINATION. Страница выбирается по параметру
+    cursor вместо page, общее количество записей не считается.
+    """
+
+    keyset_pagination = None
+    cursor_kwarg = 'cursor'
+
+    def use_keyset_pagination(self):
+        if self.keyset_pagination is None:
+            return getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+        return self.keyset_pagination
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Кэш страницы целиком для анонимных GET-запросов.
+    Ключ включает общую версию лент, которая сбрасывается сигналами при
+    изменении контента. Время жизни не превышает времени до ближайшей
+    отложенной публикации, чтобы пост появился в ленте вовремя. В ключ
+    входят только параметры из page_cache_params; запросы с другими
+    параметрами не кэшируются, чтобы произвольные строки запроса не
+    заполняли кэш.
+    """
+
+    page_cache_params = ('page', 'cursor', 'q')
+
+    def get_page_cache_params(self, request):
+        """Непустые параметры страницы для ключа кэша или None."""
+        if not set(request.GET) <= set(self.page_cache_params):
+            return None
+        params = {}
+        for name, values in request.GET.lists():
+            if len(values) > 1:
+                return None
+            value = values[0].strip()
+            if value:
+                params[name] = value
+        return params
+
+    def get(self, request, *args, **kwargs):
+        params = self.get_page_cache_params(request)
+        if request.user.is_authenticated or params is None:
+            return super().get(request, *args, **kwargs)
+        key = page_cache_key(request.path, params)
+        content = cache.get(key)
+        if content is not None:
+            response = HttpResponse(content)
+        else:
+            response = super().get(request, *args, **kwargs)
+            response.add_post_render_callback(partial(self.cache_page, key))
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def get_page_cache_timeout(self):
+        timeout = getattr(
+            settings, 'BLOG_PAGE_CACHE_TIMEOUT', DEFAULT_PAGE_CACHE_TIMEOUT
+        )
+        until_next = seconds_until_next_publication()
+        if until_next is not None:
+            timeout = min(timeout, int(until_next))
+        return timeout
+
+    def cache_page(self, key, response):
+        if response.status_code != HTTPStatus.OK:
+            return
+        timeout = self.get_page_cache_timeout()
+        if timeout > 0:
+            cache.set(key, response.content, timeout)
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы по ETag.
+    Валидатор собирается из токенов версий в кэше (см. blog.cache) до
+    выборки постов, поэтому при совпадении If-None-Match ответ 304
+    возвращается без тяжелых запросов и рендеринга. Для вошедшего
+    пользователя в валидатор входят его id, версия и CSRF-cookie: автору
+    видны неопубликованные посты и кнопки редактирования, а формы страницы
+    содержат токен. По умолчанию страница зависит от общей версии лент и
+    даты ближайшей отложенной публикации.
+    """
+
+    def get_validator(self):
+        """Пары (имя, pk) версий и дополнительные значения валидатора.
+        None, если ETag для страницы не вычисляется.
+        """
+        return [FEED], [cached_next_publication()]
+
+    def get_etag(self):
+        validator = self.get_validator()
+        if validator is None:
+            return None
+        keys, extra = validator
+        user = self.request.user
+        if user.is_authenticated:
+            keys = [*keys, ('user', user.pk)]
+            extra = [*extra, user.pk, self.request.COOKIES.get(
+                settings.CSRF_COOKIE_NAME, '')]
+        value = ':'.join([get_versions(*keys), *map(str, extra)])
+        return '"%s"' % md5(value.encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        response = None
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code in (
+            HTTPStatus.OK, HTTPStatus.NOT_MODIFIED
+        ):
+            response.headers.setdefault('ETag', etag)
+        patch_vary_headers(response, ('Cookie',))
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+        return response
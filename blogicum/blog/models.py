@@ -4,9 +4,16 @@
 """
 
 
+from collections import Counter
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models.lookups import Exact, LessThanOrEqual
 from django.urls import reverse
+from django.utils import timezone
+
+from blog.cache import bump_feed_version, bump_version
+from blog.storage import post_image_storage
 
 User = get_user_model()
 
@@ -14,6 +21,8 @@ TITLE_MAX_LENGTH = 256
 NAME_MAX_LENGTH = 256
 SLUG_MAX_LENGTH = 50
 TEXT_PREVIEW_LENGTH = 50
+# Поля поста, от которых зависит флаг is_visible
+VISIBILITY_FIELDS = {'is_published', 'pub_date', 'category', 'category_id'}
 
 
 class BaseModel(models.Model):
@@ -40,6 +49,30 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class CategoryQuerySet(models.QuerySet):
+    """Запросы к категориям.
+    update не отправляет post_save, поэтому при смене публикации видимость
+    постов затронутых категорий пересчитывается здесь же.
+    """
+
+    def update(self, **kwargs):
+        if 'is_published' not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            # Категории выбираются до UPDATE: фильтр может зависеть от
+            # is_published
+            pks = list(self.values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            Post.objects.filter(category__in=pks).recompute_visibility()
+        bump_version('category', 'all')
+        bump_version('post', 'all')
+        for pk in pks:
+            bump_version('category', pk)
+            bump_version('category-posts', pk)
+        bump_feed_version()
+        return rows
+
+
 class Category(BaseModel):
     """Модель с категориями.
     Наследуется от абстрактной модели BaseModel (получает все ее атрибуты).
@@ -62,6 +95,8 @@ class Category(BaseModel):
         verbose_name='Идентификатор'
     )
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
@@ -89,6 +124,80 @@ class Location(BaseModel):
         return self.name[:TEXT_PREVIEW_LENGTH]
 
 
+def visibility_expression(now, values=None):
+    """Значение is_visible для UPDATE.
+    values - новые значения полей из update(); для остальных полей берутся
+    текущие значения строки. Категория проверяется подзапросом, так как
+    UPDATE не допускает JOIN.
+    """
+    values = values or {}
+
+    def new_value(name, field):
+        value = values.get(name, models.F(name))
+        if hasattr(value, 'resolve_expression'):
+            return value
+        return models.Value(value, output_field=field)
+
+    category = values.get(
+        'category', values.get('category_id', models.F('category_id'))
+    )
+    if category is None:
+        return models.Value(False)
+    if isinstance(category, Category):
+        category = category.pk
+    elif isinstance(category, models.F):
+        category = models.OuterRef(category.name)
+    return models.Case(
+        models.When(
+            models.Q(
+                models.Exists(Category.objects.filter(
+                    pk=category, is_published=True
+                )),
+                Exact(new_value('is_published', models.BooleanField()), True),
+                LessThanOrEqual(
+                    new_value('pub_date', models.DateTimeField()), now
+                ),
+            ),
+            then=models.Value(True),
+        ),
+        default=models.Value(False),
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    """Запросы к постам.
+    bulk_create и update не вызывают save(), поэтому флаг is_visible
+    вычисляется здесь же, если меняются поля, от которых он зависит.
+    """
+
+    def recompute_visibility(self, now=None):
+        """Пересчет is_visible одним UPDATE; возвращает число строк."""
+        return self.update(
+            is_visible=visibility_expression(now or timezone.now())
+        )
+
+    def update(self, **kwargs):
+        if VISIBILITY_FIELDS & kwargs.keys() and 'is_visible' not in kwargs:
+            kwargs['is_visible'] = visibility_expression(
+                timezone.now(), kwargs
+            )
+        return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        published = set(Category.objects.filter(
+            pk__in={post.category_id for post in objs}, is_published=True
+        ).values_list('pk', flat=True))
+        now = timezone.now()
+        for post in objs:
+            post.is_visible = (
+                post.is_published
+                and post.category_id in published
+                and post.pub_date <= now
+            )
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Post(BaseModel):
     """Модель с постами.
     1) title - используется для отображения заголовка, обязательное поле,
@@ -99,7 +208,13 @@ class Post(BaseModel):
     5) location - внешний ключ(FK) к таблице с локациями, необязательное поле
     (blank=True), устанавливается NULL при удалении связанных объектов;
     6) category - внешний ключ(FK) к таблице с категориями, обязательное поле,
-    устанавливается NULL при удалении связанных объектов.
+    устанавливается NULL при удалении связанных объектов; 7) image - фото,
+    необязательное поле; image_variants_name - имя фото, для которого уже
+    созданы уменьшенные копии (если совпадает с image, копии готовы);
+    is_visible - пост виден всем: опубликован сам, опубликована его категория
+    и наступило время публикации. Флаг пересчитывается при сохранении поста,
+    при смене публикации категории (blog.signals) и командой
+    publish_due_posts для отложенных постов.
     """
 
     title = models.CharField(
@@ -130,12 +245,78 @@ class Post(BaseModel):
         related_name='posts',
         verbose_name='Категория'
     )
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='posts_images',
+        storage=post_image_storage,
+        blank=True
+    )
+    image_variants_name = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        help_text='Изображение, для которого созданы уменьшенные копии.',
+        verbose_name='Копии изображения'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в лентах'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False, is_published=True),
+                name='post_pending_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(fields=('image',), name='post_image_idx'),
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+        )
+
+    def compute_visibility(self, now=None):
+        return bool(
+            self.is_published
+            and self.category_id is not None
+            and self.category.is_published
+            and self.pub_date <= (now or timezone.now())
+        )
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.is_visible = self.compute_visibility()
+        if update_fields is not None and VISIBILITY_FIELDS & set(
+            update_fields
+        ):
+            update_fields = {*update_fields, 'is_visible'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @property
+    def image_variants_ready(self):
+        return bool(self.image) and self.image_variants_name == self.image.name
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'id': self.id})
@@ -144,6 +325,24 @@ class Post(BaseModel):
         return self.title[:TEXT_PREVIEW_LENGTH]
 
 
+class CommentQuerySet(models.QuerySet):
+    """Запросы к комментариям.
+    bulk_create не отправляет сигналы, поэтому счетчик comment_count у постов
+    обновляется здесь же, одной транзакцией.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            added = Counter(comment.post_id for comment in objs)
+            for post_id, count in added.items():
+                Post.objects.filter(pk=post_id).update(
+                    comment_count=models.F('comment_count') + count
+                )
+        bump_feed_version()
+        return objs
+
+
 class Comment(models.Model):
     """Модель комментария."""
 
@@ -164,6 +363,8 @@ class Comment(models.Model):
         verbose_name='Автор публикации'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'Комментарий'
@@ -171,3 +372,103 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:TEXT_PREVIEW_LENGTH]
+
+
+class ImageJob(models.Model):
+    """Задание на обработку загруженного изображения поста.
+    Выполняется командой process_image_jobs вне HTTP-запроса: ответ
+    возвращается сразу после сохранения оригинала.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Пост'
+    )
+    image_name = models.CharField(
+        max_length=100,
+        verbose_name='Файл изображения'
+    )
+    result_name = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text='Обработанный файл, на который переведены посты.',
+        verbose_name='Результат'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начато'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершено'
+    )
+
+    class Meta:
+        ordering = ('created_at',)
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        indexes = (
+            models.Index(fields=('status', 'created_at'),
+                         name='imagejob_queue_idx'),
+            models.Index(fields=('image_name',), name='imagejob_image_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
+
+
+class PostSearchIndex(models.Model):
+    """Строка полнотекстового индекса поста (см. blog.search).
+    Хранит не исходный текст, а основы слов (blog.tokenizer).
+    Таблица создается миграцией под конкретную СУБД и заполняется
+    сигналами; модель нужна только для соединения с постами в запросах.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index',
+        verbose_name='Пост'
+    )
+    title_tokens = models.TextField(verbose_name='Основы слов заголовка')
+    text_tokens = models.TextField(verbose_name='Основы слов текста')
+    category_tokens = models.TextField(verbose_name='Основы слов категории')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
+        verbose_name = 'поисковый индекс'
+        verbose_name_plural = 'Поисковый индекс'
@@ -0,0 +1,209 @@
+"""Постраничная навигация по ключу (keyset/seek pagination).
+В отличие от стандартного Paginator не использует OFFSET и не считает общее
+количество записей: каждая страница выбирается условием по паре ключей
+(например, pub_date и id) относительно последней записи предыдущей страницы,
+поэтому страница N стоит столько же, сколько первая.
+EstimatedCountPaginator - обычный Paginator, который для больших таблиц без
+фильтров берет количество строк из статистики СУБД вместо COUNT(*).
+"""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+ESTIMATE_SQL = {
+    'postgresql': (
+        'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    ),
+    # Первое число stat - количество строк таблицы на момент ANALYZE
+    'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+}
+
+
+class InvalidCursor(InvalidPage):
+    """Некорректный или подделанный курсор."""
+
+    pass
+
+
+class KeysetPage(Sequence):
+    """Страница, полученная по курсору.
+    Повторяет используемую в шаблонах часть интерфейса django Page.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинатор по ключу.
+    keys - поля, по которым упорядочена выборка, последнее должно быть
+    уникальным; descending - направление сортировки по всем ключам.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id'),
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.keys = tuple(keys)
+        self.descending = descending
+
+    def encode_cursor(self, obj, backwards=False):
+        """Непрозрачный курсор: значения ключей объекта и направление."""
+        values = [
+            self._get_field(key).value_to_string(obj) for key in self.keys
+        ]
+        payload = json.dumps([values, int(backwards)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Разбор курсора в значения ключей и направление."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values, backwards = json.loads(base64.urlsafe_b64decode(padded))
+            if len(values) != len(self.keys):
+                raise ValueError
+            values = [
+                self._get_field(key).to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+            # Ключи пагинации не бывают пустыми; сравнение с NULL в фильтре
+            # страницы невозможно
+            if None in values:
+                raise ValueError
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        return values, bool(backwards)
+
+    def page(self, cursor=None):
+        """Страница после (или перед) записью, закодированной в курсоре."""
+        values, backwards = (
+            self.decode_cursor(cursor) if cursor else (None, False)
+        )
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        rows = list(
+            queryset.order_by(*self._ordering(backwards))[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if rows and has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if rows and has_previous else None
+            ),
+        )
+
+    def between(self, after=None, until=None):
+        """Условие для записей после курсора after и до курсора until
+        включительно, в порядке пагинатора.
+        """
+        condition = Q()
+        if after is not None:
+            condition &= self._seek(self.decode_cursor(after)[0], False)
+        if until is not None:
+            condition &= ~self._seek(self.decode_cursor(until)[0], False)
+        return condition
+
+    def _get_field(self, key):
+        return self.object_list.model._meta.get_field(key)
+
+    def _ordering(self, backwards):
+        prefix = '-' if self.descending != backwards else ''
+        return [prefix + key for key in self.keys]
+
+    def _seek(self, values, backwards):
+        """Условие вида (k1 < v1) OR (k1 = v1 AND k2 < v2) ..."""
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        conditions = []
+        for index, key in enumerate(self.keys):
+            equal = dict(zip(self.keys[:index], values[:index]))
+            conditions.append(
+                Q(**equal, **{f'{key}__{lookup}': values[index]})
+            )
+        return reduce(or_, conditions)
+
+
+def estimate_count(model, using='default'):
+    """Примерное количество строк таблицы по статистике СУБД или None."""
+    connection = connections[using]
+    sql = ESTIMATE_SQL.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # В SQLite таблицы sqlite_stat1 нет до первого ANALYZE
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator с оценкой количества строк для таблиц без фильтров.
+    Точный COUNT(*) выполняется, если в запросе есть условия, статистики нет
+    или по ней в таблице меньше threshold строк.
+    """
+
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_count(
+                self.object_list.model, self.object_list.db
+            )
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,66 @@
+"""Публикация отложенных постов.
+Пост с датой в будущем сохраняется с is_visible=False. Когда дата
+наступает, publish_due_posts переводит такие посты в видимые одним UPDATE
+и для каждого отправляет сигнал post_published: по нему сбрасываются кэши
+и ленты и дописывается карта сайта (см. blog.signals). До этого пост уже
+виден в лентах по дате (см. published_q), поэтому задержка воркера влияет
+только на сигнал и карту сайта. Ближайшая дата берется по частичному
+индексу post_pending_idx, поэтому держать очередь в памяти не нужно: воркер
+(publish_due_posts --loop) спит ровно до нее, но не дольше max_sleep, чтобы
+заметить посты, запланированные за это время.
+"""
+import time
+
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.models import Post
+from blog.utils import pending_posts
+
+DEFAULT_MAX_SLEEP = 60
+
+# Отправляется с sender=Post и instance - опубликованным постом
+post_published = Signal()
+
+
+def publish_due_posts(now=None):
+    """Публикация постов, время которых наступило; возвращает их id.
+    Строки блокируются с SKIP LOCKED, поэтому параллельные воркеры не
+    публикуют один пост дважды.
+    """
+    due = pending_posts().filter(pub_date__lte=now or timezone.now())
+    with transaction.atomic():
+        pks = list(
+            due.select_for_update(skip_locked=True, of=('self',))
+            .order_by('pub_date', 'pk').values_list('pk', flat=True)
+        )
+        if not pks:
+            return []
+        Post.objects.filter(pk__in=pks).update(is_visible=True)
+        posts = Post.objects.filter(pk__in=pks).select_related(
+            'category', 'author'
+        ).order_by('pub_date', 'pk')
+        for post in posts:
+            post_published.send(sender=Post, instance=post)
+    return pks
+
+
+def seconds_until_due(max_sleep=DEFAULT_MAX_SLEEP):
+    """Пауза воркера до ближайшей публикации, не больше max_sleep."""
+    next_pub_date = pending_posts().order_by('pub_date').values_list(
+        'pub_date', flat=True).first()
+    if next_pub_date is None:
+        return max_sleep
+    delay = (next_pub_date - timezone.now()).total_seconds()
+    return min(max(delay, 0), max_sleep)
+
+
+def run_publisher(max_sleep=DEFAULT_MAX_SLEEP, on_publish=None):
+    """Бесконечный цикл публикации для отдельного процесса."""
+    while True:
+        close_old_connections()
+        published = publish_due_posts()
+        if published and on_publish is not None:
+            on_publish(published)
+        time.sleep(seconds_until_due(max_sleep))
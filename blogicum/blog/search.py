@@ -0,0 +1,241 @@
+"""Полнотекстовый поиск по постам.
+Индекс - таблица blog_post_search с основами слов заголовка, текста и
+названия категории поста (см. blog.tokenizer): на SQLite это виртуальная
+таблица FTS5, на PostgreSQL - таблица с вычисляемым столбцом tsvector и
+GIN-индексом. Основы считаются при записи, строка индекса связана с постом
+по rowid = id поста и обновляется сигналом (blog.signals), поэтому запрос
+поиска - один JOIN с индексом, без LIKE по всей таблице постов.
+Выражения ниже подставляют SQL нужной СУБД; видимость постов определяется
+исходным queryset, к которому применяется поиск. Совпадения подсвечиваются
+при выводе страницы результатов.
+"""
+from django.db import NotSupportedError, connection, transaction
+from django.db.models import BooleanField, Expression, F, FloatField
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.tokenizer import WORD_RE, index_tokens, stem, tokenize
+
+INDEX_TABLE = 'blog_post_search'
+INDEX_COLUMNS = ('title_tokens', 'text_tokens', 'category_tokens')
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0)
+MAX_TERMS = 10
+# Маркеры подсветки из области частного использования Unicode: в тексте
+# постов их нет, а HTML-теги вокруг совпадений ставятся после
+# экранирования текста
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+SNIPPET_WORDS = 32
+DEFAULT_BATCH_SIZE = 500
+
+INSERT = (
+    f'INSERT INTO {INDEX_TABLE} (rowid, {", ".join(INDEX_COLUMNS)}) '
+    'VALUES (%s, %s, %s, %s)'
+)
+# Запись строки индекса - один запрос: FTS5 не поддерживает UPSERT, но
+# заменяет строку с тем же rowid через INSERT OR REPLACE. Строки удаленных
+# постов убирает сама СУБД: триггер на SQLite, каскад внешнего ключа на
+# PostgreSQL
+DML = {
+    'sqlite': {
+        'insert': INSERT.replace('INSERT', 'INSERT OR REPLACE', 1),
+    },
+    'postgresql': {
+        'insert': INSERT + ' ON CONFLICT (rowid) DO UPDATE SET ' + ', '.join(
+            f'{column} = EXCLUDED.{column}' for column in INDEX_COLUMNS
+        ),
+    },
+}
+PRUNE = (
+    f'DELETE FROM {INDEX_TABLE} WHERE rowid NOT IN (SELECT id FROM blog_post)'
+)
+
+
+def search_terms(query):
+    """Основы слов запроса."""
+    return tokenize(query)[:MAX_TERMS]
+
+
+class IndexExpression(Expression):
+    """Выражение над строкой индекса, присоединенной к посту.
+    Соединение с blog_post_search создается через отношение search_index;
+    псевдоним таблицы берется из разрешенного столбца.
+    """
+
+    def __init__(self, terms, output_field):
+        super().__init__(output_field=output_field)
+        self.terms = terms
+        self.column = F('search_index__title_tokens')
+
+    def get_source_expressions(self):
+        return [self.column]
+
+    def set_source_expressions(self, exprs):
+        self.column, = exprs
+
+    def index_alias(self, compiler):
+        return compiler.quote_name_unless_alias(self.column.alias)
+
+    def sqlite_query(self):
+        return ' '.join(f'"{term}"*' for term in self.terms)
+
+    def postgresql_query(self):
+        return ' & '.join(f'{term}:*' for term in self.terms)
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            f'Полнотекстовый поиск не поддерживается для {connection.vendor}'
+        )
+
+
+class SearchMatch(IndexExpression):
+    """Условие совпадения поста с запросом."""
+
+    conditional = True
+
+    def __init__(self, terms):
+        super().__init__(terms, BooleanField())
+
+    def as_sqlite(self, compiler, connection):
+        alias = self.index_alias(compiler)
+        return f'{alias}.{INDEX_TABLE} MATCH %s', [self.sqlite_query()]
+
+    def as_postgresql(self, compiler, connection):
+        alias = self.index_alias(compiler)
+        return (f"{alias}.document @@ to_tsquery('simple', %s)",
+                [self.postgresql_query()])
+
+
+class SearchRank(IndexExpression):
+    """Релевантность: чем больше, тем выше пост в выдаче.
+    Совпадения в заголовке весят больше, чем в категории и тексте.
+    """
+
+    def __init__(self, terms):
+        super().__init__(terms, FloatField())
+
+    def as_sqlite(self, compiler, connection):
+        alias = self.index_alias(compiler)
+        weights = ', '.join(['%s'] * len(COLUMN_WEIGHTS))
+        return (f'-bm25({alias}.{INDEX_TABLE}, {weights})',
+                list(COLUMN_WEIGHTS))
+
+    def as_postgresql(self, compiler, connection):
+        alias = self.index_alias(compiler)
+        return (f"ts_rank_cd({alias}.document, "
+                f"to_tsquery('simple', %s))", [self.postgresql_query()])
+
+
+def search_posts(queryset, query):
+    """Посты из queryset, найденные по запросу, по убыванию релевантности."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    # FTS5 допускает MATCH только при внутреннем соединении с индексом
+    matches = queryset.filter(search_index__isnull=False)
+    return matches.filter(SearchMatch(terms)).annotate(
+        search_rank=SearchRank(terms)
+    ).order_by('-search_rank', '-pub_date')
+
+
+def is_match(word, terms):
+    word_stem = stem(word)
+    return any(word_stem.startswith(term) for term in terms)
+
+
+def _mark(text, terms):
+    def replace(match):
+        word = match.group()
+        if is_match(word, terms):
+            return f'{MARK_START}{word}{MARK_END}'
+        return word
+    return WORD_RE.sub(replace, text)
+
+
+def render_highlight(value):
+    """HTML с тегами <mark> вокруг совпадений; остальной текст экранирован."""
+    return mark_safe(
+        escape(value)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def highlight(text, query):
+    """Текст целиком с отмеченными совпадениями."""
+    return render_highlight(_mark(text, search_terms(query)))
+
+
+def snippet(text, query, size=SNIPPET_WORDS):
+    """Фрагмент текста вокруг первого совпадения."""
+    terms = search_terms(query)
+    words = list(WORD_RE.finditer(text))
+    if len(words) <= size:
+        return render_highlight(_mark(text, terms))
+    first = next(
+        (index for index, word in enumerate(words)
+         if is_match(word.group(), terms)),
+        0
+    )
+    start = max(min(first - size // 4, len(words) - size), 0)
+    end = start + size
+    fragment = text[words[start].start():words[end - 1].end()]
+    return render_highlight(
+        ('…' if start else '')
+        + _mark(fragment, terms)
+        + ('…' if end < len(words) else '')
+    )
+
+
+def dml(name):
+    try:
+        return DML[connection.vendor][name]
+    except KeyError:
+        raise NotSupportedError(
+            f'Полнотекстовый поиск не поддерживается для {connection.vendor}'
+        )
+
+
+def index_row(post):
+    category = post.category.title if post.category_id else ''
+    return (
+        post.pk,
+        index_tokens(post.title),
+        index_tokens(post.text),
+        index_tokens(category),
+    )
+
+
+def index_posts(posts):
+    """Добавление или обновление постов в индексе."""
+    rows = [index_row(post) for post in posts]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(dml('insert'), rows)
+
+
+def reindex_posts(queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """Индексация постов queryset пачками по первичному ключу.
+    Каждая пачка записывается в своей транзакции.
+    """
+    posts = queryset.select_related('category').only(
+        'pk', 'title', 'text', 'category__title'
+    ).order_by('pk')
+    indexed = 0
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return indexed
+        with transaction.atomic():
+            index_posts(batch)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+
+
+def prune_index():
+    """Удаление строк индекса, оставшихся от удаленных постов."""
+    with connection.cursor() as cursor:
+        cursor.execute(PRUNE)
+        return cursor.rowcount
@@ -0,0 +1,206 @@
+"""Обработчики сигналов моделей блога.
+Счетчик comment_count у поста обновляется атомарно через F(), без пересчета
+всех комментариев. Изменение поста, категории, местоположения или автора
+сбрасывает версию кэшированных карточек постов и страниц лент, изменение
+комментария - версию комментариев поста. Файлы изображений, на которые после
+удаления или замены не осталось ссылок, удаляются после фиксации транзакции.
+Полнотекстовый индекс обновляется при изменении заголовка, текста или
+категории поста и названия категории. Смена публикации категории
+пересчитывает флаг is_visible ее постов; публикация отложенного поста
+(blog.publishing) сбрасывает кэши и дописывает карту сайта.
+"""
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from blog.cache import bump_feed_version, bump_version
+from blog.jobs import enqueue_image_job
+from blog.models import Category, Comment, Location, Post
+from blog.publishing import post_published
+from blog.search import index_posts, reindex_posts
+from blog.sitemaps import schedule_sitemaps_update, sitemaps_generated
+from blog.utils import collect_orphan_image
+
+User = get_user_model()
+
+VERSIONED_MODELS = {
+    Post: 'post',
+    Category: 'category',
+    Location: 'location',
+    User: 'user',
+}
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличение счетчика при добавлении комментария."""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+        bump_feed_version()
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    """Уменьшение счетчика при удалении комментария.
+    При удалении самого поста комментарии удаляются каскадно, и обновлять
+    удаляемую строку не нужно.
+    """
+    if getattr(origin, 'model', type(origin)) is Post:
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+    bump_feed_version()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_version(sender, instance, **kwargs):
+    """Сброс версии комментариев поста при любом их изменении."""
+    bump_version('comments', instance.post_id)
+
+
+def bump_model_version(sender, instance, update_fields=None, **kwargs):
+    """Сброс кэша фрагментов, зависящих от измененной записи.
+    Сбрасывается и общая версия записей этой модели: от нее зависят
+    страницы с комментариями и ленты RSS.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    name = VERSIONED_MODELS[sender]
+    bump_version(name, instance.pk)
+    bump_version(name, 'all')
+    bump_feed_version()
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(
+        bump_model_version, sender=model,
+        dispatch_uid=f'bump_version_save_{model._meta.label_lower}'
+    )
+    post_delete.connect(
+        bump_model_version, sender=model,
+        dispatch_uid=f'bump_version_delete_{model._meta.label_lower}'
+    )
+
+
+@receiver(post_init, sender=Post)
+def remember_feed_scope(sender, instance, **kwargs):
+    """Категория и автор поста на момент загрузки из базы."""
+    instance._loaded_scope = (
+        instance.__dict__.get('category_id'),
+        instance.__dict__.get('author_id'),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_feed_scope_versions(sender, instance, **kwargs):
+    """Сброс лент категории и автора, в которые пост входил или входит."""
+    category_ids, author_ids = zip(
+        instance._loaded_scope, (instance.category_id, instance.author_id)
+    )
+    for category_id in set(category_ids) - {None}:
+        bump_version('category-posts', category_id)
+    for author_id in set(author_ids) - {None}:
+        bump_version('author-posts', author_id)
+    instance._loaded_scope = (instance.category_id, instance.author_id)
+
+
+@receiver(post_published, sender=Post)
+def bump_published_post_versions(sender, instance, **kwargs):
+    """Сброс кэша поста, его лент и страниц лент в момент публикации."""
+    bump_version('post', instance.pk)
+    bump_version('post', 'all')
+    bump_version('category-posts', instance.category_id)
+    bump_version('author-posts', instance.author_id)
+    bump_feed_version()
+
+
+@receiver(post_published, sender=Post)
+def extend_sitemaps(sender, instance, **kwargs):
+    """Дописывание опубликованных постов в уже созданную карту сайта."""
+    if sitemaps_generated():
+        schedule_sitemaps_update()
+
+
+SEARCH_FIELDS = {'title', 'text', 'category'}
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """Обновление строки поста в полнотекстовом индексе."""
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    index_posts([instance])
+
+
+@receiver(post_init, sender=Category)
+def remember_category_title(sender, instance, **kwargs):
+    instance._loaded_title = instance.__dict__.get('title')
+    instance._loaded_is_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, created, **kwargs):
+    """Пересчет видимости постов категории одним UPDATE после смены ее
+    публикации.
+    """
+    if not created and instance._loaded_is_published != instance.is_published:
+        instance.posts.recompute_visibility()
+    instance._loaded_is_published = instance.is_published
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Посты удаленной категории остаются без нее и перестают быть видны."""
+    instance.posts.filter(is_visible=True).update(is_visible=False)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_posts(sender, instance, created, **kwargs):
+    """Переиндексация постов категории после смены ее названия."""
+    if not created and instance._loaded_title != instance.title:
+        reindex_posts(instance.posts.all())
+    instance._loaded_title = instance.title
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    """Имя изображения на момент загрузки поста из базы."""
+    image = instance.__dict__.get('image')
+    instance._loaded_image = image if isinstance(image, str) else None
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, raw=False, **kwargs):
+    """Постановка нового или замененного изображения в очередь обработки."""
+    if raw or not instance.image or instance.image_variants_ready:
+        return
+    enqueue_image_job(instance)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, raw=False, **kwargs):
+    """Удаление замененного изображения, если оно больше не используется."""
+    loaded = instance._loaded_image
+    instance._loaded_image = instance.image.name
+    if raw or not loaded or loaded == instance.image.name:
+        return
+    transaction.on_commit(partial(collect_orphan_image, loaded))
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    """Удаление изображения удаленного поста, если на него нет ссылок."""
+    if instance.image:
+        transaction.on_commit(
+            partial(collect_orphan_image, instance.image.name)
+        )
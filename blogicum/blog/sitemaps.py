@@ -0,0 +1,360 @@
+"""Карта сайта: индекс и сжатые файлы по 50 000 адресов.
+Файлы пишутся командой generate_sitemaps в каталог BLOG_SITEMAP_DIR и
+отдаются с диска. Генерация инкрементальная: для каждого раздела (посты,
+категории, профили) в state.json хранится курсор последней записанной
+записи (см. KeysetPaginator) и список файлов. Новые записи дописываются в
+последний неполный файл раздела и в новые файлы; уже заполненные файлы не
+перезаписываются. Для каждого файла запоминаются курсор его последней
+записи, число адресов и сумма id: если записи в диапазоне файла изменились
+(пост стал виден задним числом - отложенный или из снова опубликованной
+категории - или снят с публикации), этот файл и следующие пишутся заново.
+Файлы хранятся в gzip и передаются как есть, если клиент принимает gzip,
+иначе распаковываются на лету.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from itertools import chain
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.html import escape
+from django.views.decorators.http import condition, require_safe
+
+from blog.models import Category, Post
+from blog.paginators import KeysetPaginator
+from blog.utils import sql_filters
+
+User = get_user_model()
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MAX_URLS = 50000
+BATCH_SIZE = 2000
+STATE_FILE = 'state.json'
+INDEX_NAME = 'sitemap'
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class PostSection:
+    name = 'posts'
+    keys = ('pub_date', 'id')
+
+    def queryset(self):
+        return sql_filters(Post.objects.only('id', 'pub_date'))
+
+    def location(self, post):
+        return reverse('blog:post_detail', args=(post.pk,))
+
+    def lastmod(self, post):
+        return post.pub_date
+
+
+class CategorySection:
+    name = 'categories'
+    keys = ('id',)
+
+    def queryset(self):
+        return Category.objects.filter(is_published=True).only(
+            'id', 'slug', 'created_at'
+        )
+
+    def location(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+    def lastmod(self, category):
+        return category.created_at
+
+
+class ProfileSection:
+    name = 'profiles'
+    keys = ('id',)
+
+    def queryset(self):
+        return User.objects.filter(is_active=True).only('id', 'username')
+
+    def location(self, user):
+        return reverse('blog:profile', args=(user.username,))
+
+    def lastmod(self, user):
+        return None
+
+
+SECTIONS = (PostSection(), CategorySection(), ProfileSection())
+
+
+def sitemap_dir():
+    return Path(settings.BLOG_SITEMAP_DIR)
+
+
+def sitemap_path(name):
+    return sitemap_dir() / f'{name}.xml.gz'
+
+
+def site_url():
+    return settings.BLOG_SITE_URL.rstrip('/')
+
+
+def load_state():
+    try:
+        return json.loads((sitemap_dir() / STATE_FILE).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def replace_file(path, write):
+    """Атомарная запись: временный файл в том же каталоге и rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        try:
+            write(tmp)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
+
+
+def url_line(loc, lastmod=None):
+    line = f'<url><loc>{escape(loc)}</loc>'
+    if lastmod is not None:
+        line += f'<lastmod>{lastmod.isoformat()}</lastmod>'
+    return line + '</url>\n'
+
+
+def existing_lines(name):
+    """Строки <url> ранее записанного файла раздела."""
+    with gzip.open(sitemap_path(name), 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.startswith('<url>'):
+                yield line
+
+
+def write_shard(name, lines, previous=False):
+    """Файл раздела из строк <url>; previous - дописать к старому файлу."""
+    def write(tmp):
+        with gzip.open(tmp, 'wt', encoding='utf-8') as file:
+            file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            file.write(f'<urlset xmlns="{SITEMAP_NS}">\n')
+            if previous:
+                file.writelines(existing_lines(name))
+            file.writelines(lines)
+            file.write('</urlset>\n')
+    replace_file(sitemap_path(name), write)
+
+
+def new_objects(section, cursor):
+    """Записи раздела после курсора пачками по ключу и курсор последней."""
+    paginator = section_paginator(section)
+    while True:
+        page = paginator.page(cursor)
+        if not page:
+            return
+        for obj in page:
+            cursor = paginator.encode_cursor(obj)
+            yield obj, cursor
+        if not page.has_next():
+            return
+
+
+def next_shard(section, shards):
+    """Последний неполный файл раздела или новый; флаг - файл уже есть."""
+    if shards and shards[-1]['count'] < MAX_URLS:
+        return shards[-1], True
+    shard = {'name': f'{section.name}-{len(shards) + 1:04d}', 'count': 0}
+    shards.append(shard)
+    return shard, False
+
+
+def section_paginator(section):
+    return KeysetPaginator(
+        section.queryset(), BATCH_SIZE, keys=section.keys, descending=False
+    )
+
+
+def changed_shard(section, shards):
+    """Номер первого файла раздела, записи которого изменились с прошлой
+    генерации, или len(shards). Все файлы сверяются одним запросом:
+    количество и сумма id записей в диапазоне курсоров каждого файла.
+    """
+    if not shards:
+        return 0
+    if any('checksum' not in shard for shard in shards):
+        # Состояние записано до появления контрольных сумм
+        return 0
+    paginator = section_paginator(section)
+    aggregates = {}
+    after = None
+    for index, shard in enumerate(shards):
+        condition = paginator.between(after, shard['cursor'])
+        aggregates[f'count_{index}'] = Count('pk', filter=condition)
+        aggregates[f'checksum_{index}'] = Sum(
+            'pk', filter=condition, default=0
+        )
+        after = shard['cursor']
+    totals = paginator.object_list.filter(
+        paginator.between(until=after)
+    ).aggregate(**aggregates)
+    for index, shard in enumerate(shards):
+        if (shard['count'], shard['checksum']) != (
+                totals[f'count_{index}'], totals[f'checksum_{index}']):
+            return index
+    return len(shards)
+
+
+def update_section(section, state):
+    """Перезапись измененных файлов раздела и дописывание новых записей;
+    возвращает число записанных адресов.
+    """
+    shards = state.setdefault('shards', [])
+    start = changed_shard(section, shards)
+    if start < len(shards):
+        del shards[start:]
+        state['cursor'] = shards[-1]['cursor'] if shards else None
+    objects = new_objects(section, state.get('cursor'))
+    added = 0
+    base = site_url()
+    first = next(objects, None)
+    while first is not None:
+        shard, previous = next_shard(section, shards)
+        progress = {'count': 0, 'checksum': 0, 'cursor': None}
+
+        def lines(first=first, limit=MAX_URLS - shard['count']):
+            # zip берет элемент итератора, только пока не исчерпан range
+            for _, (obj, cursor) in zip(range(limit), chain([first], objects)):
+                progress['count'] += 1
+                progress['checksum'] += obj.pk
+                progress['cursor'] = cursor
+                yield url_line(
+                    base + section.location(obj), section.lastmod(obj)
+                )
+
+        write_shard(shard['name'], lines(), previous)
+        shard['count'] += progress['count']
+        shard['checksum'] = shard.get('checksum', 0) + progress['checksum']
+        shard['cursor'] = progress['cursor']
+        shard['lastmod'] = datetime.now(timezone.utc).isoformat()
+        state['cursor'] = progress['cursor']
+        added += progress['count']
+        first = next(objects, None)
+    return added
+
+
+def write_index(state):
+    base = site_url()
+    lines = [
+        f'<sitemap><loc>{escape(base + sitemap_url(shard["name"]))}</loc>'
+        f'<lastmod>{shard["lastmod"]}</lastmod></sitemap>\n'
+        for section in SECTIONS
+        for shard in state.get(section.name, {}).get('shards', [])
+    ]
+
+    def write(tmp):
+        with gzip.open(tmp, 'wt', encoding='utf-8') as file:
+            file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            file.write(f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+            file.writelines(lines)
+            file.write('</sitemapindex>\n')
+    replace_file(sitemap_path(INDEX_NAME), write)
+
+
+def sitemaps_generated():
+    return (sitemap_dir() / STATE_FILE).is_file()
+
+
+def generate_sitemaps(full=False):
+    """Обновление файлов карты сайта; возвращает число записанных адресов
+    по разделам. full - сгенерировать все файлы заново. Если разделы не
+    изменились, файлы не перезаписываются.
+    """
+    state = {} if full else load_state()
+    previous = json.dumps(state, sort_keys=True)
+    added = {
+        section.name: update_section(
+            section, state.setdefault(section.name, {})
+        )
+        for section in SECTIONS
+    }
+    if (not full and sitemaps_generated()
+            and json.dumps(state, sort_keys=True) == previous):
+        return added
+    write_index(state)
+    replace_file(
+        sitemap_dir() / STATE_FILE,
+        lambda tmp: tmp.write(json.dumps(state, indent=2).encode())
+    )
+    remove_stale_shards(state)
+    return added
+
+
+def schedule_sitemaps_update(using=None):
+    """Обновление карты сайта после коммита текущей транзакции.
+    Сколько бы постов ни было опубликовано в транзакции, генерация
+    запускается один раз.
+    """
+    connection = transaction.get_connection(using)
+    if any(generate_sitemaps in entry for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(generate_sitemaps, using=using)
+
+
+def remove_stale_shards(state):
+    """Удаление файлов разделов, которых нет в индексе."""
+    names = {
+        shard['name']
+        for section in SECTIONS
+        for shard in state[section.name]['shards']
+    }
+    for path in sitemap_dir().glob('*-*.xml.gz'):
+        if path.name.removesuffix('.xml.gz') not in names:
+            path.unlink(missing_ok=True)
+
+
+def sitemap_url(name):
+    if name == INDEX_NAME:
+        return reverse('blog:sitemap')
+    return reverse('blog:sitemap_section', args=(name,))
+
+
+def existing_path(name):
+    path = sitemap_path(name)
+    if not path.is_file():
+        raise Http404('Карта сайта еще не сгенерирована.')
+    return path
+
+
+def sitemap_last_modified(request, name=INDEX_NAME):
+    try:
+        mtime = sitemap_path(name).stat().st_mtime
+    except FileNotFoundError:
+        return None
+    return datetime.fromtimestamp(mtime, timezone.utc)
+
+
+def decompressed(path):
+    with gzip.open(path, 'rb') as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+@require_safe
+@condition(last_modified_func=sitemap_last_modified)
+def serve_sitemap(request, name=INDEX_NAME):
+    """Файл карты сайта: сжатый, если клиент принимает gzip."""
+    path = existing_path(name)
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = FileResponse(open(path, 'rb'), content_type=CONTENT_TYPE)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(
+            decompressed(path), content_type=CONTENT_TYPE
+        )
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
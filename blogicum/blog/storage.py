@@ -0,0 +1,124 @@
+"""Хранилище изображений постов с адресацией по содержимому.
+Файл сохраняется под именем из SHA-256 его байтов:
+posts_images/3f/3f9a...c1.jpg. Повторная загрузка того же файла (например,
+при редактировании поста) не пишет данные заново, а возвращает уже
+существующее имя, поэтому одинаковые изображения хранятся в одном
+экземпляре. Ссылки на файл - строки Post с тем же image; неиспользуемые
+файлы удаляет blog.utils.collect_orphan_image. Проверка существования в
+save и проверка ссылок перед удалением выполняются под блокировкой имени
+(lock), поэтому save не вернет имя файла, который в этот момент удаляется.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+from contextlib import contextmanager
+from uuid import uuid4
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки между процессами нет
+    fcntl = None
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+HASH_CHUNK_SIZE = 64 * 1024
+HASH_RE = re.compile(r'[0-9a-f]{64}')
+LOCK_DIR = 'blogicum-media-locks'
+
+
+def content_hash(content):
+    """SHA-256 содержимого файла.
+    Если хэш уже посчитан при потоковой загрузке, файл не читается.
+    """
+    digest = getattr(content, 'content_hash', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+def content_name(name, digest):
+    """posts_images/photo.JPG -> posts_images/3f/3f9a...c1.jpg
+    Для имени, уже построенного по хэшу (например, при сохранении
+    обработанной копии файла), подкаталог с префиксом хэша не повторяется.
+    """
+    directory, filename = posixpath.split(name)
+    stem, extension = posixpath.splitext(filename)
+    if HASH_RE.fullmatch(stem) and posixpath.basename(directory) == stem[:2]:
+        directory = posixpath.dirname(directory)
+    return posixpath.join(directory, digest[:2], digest + extension.lower())
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, именующее файлы по хэшу содержимого."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = content_name(name, content_hash(content))
+        with self.lock(name):
+            if self.exists(name):
+                try:
+                    # Время изменения - время последнего использования:
+                    # collect_post_images не трогает недавние файлы
+                    os.utime(self.path(name))
+                    return name
+                except FileNotFoundError:
+                    # Файл удален после проверки - записывается заново
+                    pass
+            return super().save(name, content, max_length=max_length)
+
+    @contextmanager
+    def lock(self, name):
+        """Блокировка имени файла между процессами и потоками.
+        Имена распределяются по 256 файлам блокировок во временном
+        каталоге, чтобы не засорять каталог медиафайлов.
+        """
+        if fcntl is None:
+            yield
+            return
+        digest = hashlib.md5(f'{self.location}:{name}'.encode()).hexdigest()
+        path = os.path.join(tempfile.gettempdir(), LOCK_DIR, digest[:2])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def overwrite(self, name, content):
+        """Запись файла точно под именем name, без адресации по хэшу.
+        Нужна для копий изображения. Файл пишется во временный рядом и
+        переименовывается, поэтому читатели не видят его недописанным.
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid4().hex}.tmp'
+        try:
+            with open(tmp_path, 'xb') as tmp:
+                for chunk in content.chunks():
+                    tmp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return name
+
+
+def post_image_storage():
+    return storages['post_images']
@@ -0,0 +1,19 @@
+"""Теги для кэширования фрагментов шаблонов блога."""
+from django import template
+
+from blog.cache import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия карточки поста.
+    Учитывает сам пост, его категорию, местоположение и автора.
+    """
+    return get_versions(
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
@@ -0,0 +1,18 @@
+"""Теги для вывода изображений постов."""
+from django import template
+
+from blog.images import srcset
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes=DEFAULT_SIZES):
+    """Изображение поста с набором уменьшенных копий, если они готовы."""
+    context = {'post': post, 'sizes': sizes}
+    if post.image_variants_ready:
+        context['srcset_webp'] = srcset(post.image, 'webp')
+        context['srcset_jpeg'] = srcset(post.image, 'jpeg')
+    return context
@@ -0,0 +1,18 @@
+"""Фильтры для страницы поиска."""
+from django import template
+
+from blog import search
+
+register = template.Library()
+
+
+@register.filter
+def highlight(value, query):
+    """Текст с отмеченными словами поискового запроса."""
+    return search.highlight(value or '', query)
+
+
+@register.filter
+def search_snippet(value, query):
+    """Фрагмент текста вокруг первого совпадения с запросом."""
+    return search.snippet(value or '', query)
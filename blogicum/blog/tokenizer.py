@@ -0,0 +1,50 @@
+"""Разбор текста для поискового индекса.
+Слова приводятся к нижнему регистру (casefold), буква ё заменяется на е,
+после чего берется основа слова стеммером Snowball: русским для кириллицы,
+английским для слов латиницей. Основы считаются при записи поста, а
+запрос проходит тот же разбор, поэтому "кошки", "Кошка" и "КОШКУ" находят
+друг друга простым поиском по индексу.
+"""
+import re
+import threading
+from functools import lru_cache
+
+import snowballstemmer
+
+WORD_RE = re.compile(r'\w+')
+STEM_CACHE_SIZE = 50000
+
+# Стеммеры Snowball хранят состояние разбора в объекте, поэтому у каждого
+# потока свои экземпляры
+_local = threading.local()
+
+
+def _stemmer(language):
+    stemmers = getattr(_local, 'stemmers', None)
+    if stemmers is None:
+        stemmers = _local.stemmers = {}
+    if language not in stemmers:
+        stemmers[language] = snowballstemmer.stemmer(language)
+    return stemmers[language]
+
+
+def normalize(word):
+    return word.casefold().replace('ё', 'е')
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """Основа слова: кошками -> кошк, Ёлки -> елк."""
+    word = normalize(word)
+    language = 'english' if word.isascii() else 'russian'
+    return _stemmer(language).stemWord(word)
+
+
+def tokenize(text):
+    """Основы всех слов текста в исходном порядке."""
+    return [stem(word) for word in WORD_RE.findall(text or '')]
+
+
+def index_tokens(text):
+    """Строка основ через пробел для записи в индекс."""
+    return ' '.join(tokenize(text))
@@ -0,0 +1,130 @@
+"""Потоковая загрузка изображений постов.
+Обработчик пишет файл частями сразу во временный каталог внутри
+MEDIA_ROOT, попутно считая SHA-256 и проверяя сигнатуру формата и размер.
+Память на загрузку не зависит от размера файла, а при сохранении
+FileSystemStorage перемещает готовый файл (rename), а не копирует его.
+Отклоненный файл дочитывается без записи на диск и попадает в форму как
+RejectedUpload с текстом ошибки.
+"""
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import (TemporaryUploadedFile,
+                                            UploadedFile)
+from django.core.files.uploadhandler import (FileUploadHandler,
+                                             StopFutureHandlers)
+from django.template.defaultfilters import filesizeformat
+
+DEFAULT_MAX_IMAGE_SIZE = 5 * 1024 * 1024
+HEADER_SIZE = 12
+IMAGE_SIGNATURES = (
+    lambda header: header.startswith(b'\xff\xd8\xff'),
+    lambda header: header.startswith(b'\x89PNG\r\n\x1a\n'),
+    lambda header: header[:6] in (b'GIF87a', b'GIF89a'),
+    lambda header: header[:4] == b'RIFF' and header[8:12] == b'WEBP',
+)
+
+
+def max_image_size():
+    return getattr(settings, 'BLOG_MAX_IMAGE_SIZE', DEFAULT_MAX_IMAGE_SIZE)
+
+
+def upload_temp_dir():
+    path = Path(getattr(settings, 'BLOG_UPLOAD_TEMP_DIR', None)
+                or Path(settings.MEDIA_ROOT) / '.uploads')
+    path.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+def has_image_signature(header):
+    return any(check(header) for check in IMAGE_SIGNATURES)
+
+
+class StreamedUploadedFile(TemporaryUploadedFile):
+    """Загруженный файл во временном каталоге рядом с MEDIA_ROOT."""
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=upload_temp_dir()
+        )
+        UploadedFile.__init__(
+            self, file, name, content_type, size, charset, content_type_extra
+        )
+        self.content_hash = None
+
+
+class RejectedUpload(UploadedFile):
+    """Пустой файл-заглушка с причиной отказа."""
+
+    def __init__(self, name, content_type, upload_error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.upload_error = upload_error
+
+
+class PostImageUploadHandler(FileUploadHandler):
+    """Обработчик загрузки поля image формы поста."""
+
+    field_name = 'image'
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.field_name
+        if not self.active:
+            return
+        self.error = None
+        self.header = b''
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.file = StreamedUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra
+        )
+        if self.content_length and self.content_length > max_image_size():
+            self.reject()
+        raise StopFutureHandlers()
+
+    def reject(self, error=None):
+        self.error = error or (
+            'Размер файла больше '
+            f'{filesizeformat(max_image_size())}.'
+        )
+        self.file.close()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        if self.error:
+            return None
+        self.size += len(raw_data)
+        if self.size > max_image_size():
+            self.reject()
+            return None
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if (len(self.header) == HEADER_SIZE
+                    and not has_image_signature(self.header)):
+                self.reject('Файл не является изображением.')
+                return None
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if not self.error and not has_image_signature(self.header):
+            self.reject('Файл не является изображением.')
+        if self.error:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.error
+            )
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.content_hash = self.hasher.hexdigest()
+        return self.file
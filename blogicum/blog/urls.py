@@ -15,7 +15,7 @@ name.
 from django.contrib.auth import get_user_model
 from django.urls import path
 
-from blog import views
+from blog import feeds, sitemaps, views
 
 User = get_user_model()
 
@@ -26,6 +26,16 @@ urlpatterns = [
          name='profile'),
     path('category/<slug:category_slug>/',
          views.CategoryPostsView.as_view(), name='category_posts'),
+    path('search/', views.SearchView.as_view(), name='search'),
+
+    path('feeds/', feeds.site_feed, name='feed'),
+    path('category/<slug:category_slug>/feed/', feeds.category_feed,
+         name='category_feed'),
+    path('profile/<slug:username>/feed/', feeds.profile_feed,
+         name='profile_feed'),
+    path('sitemap.xml', sitemaps.serve_sitemap, name='sitemap'),
+    path('sitemaps/<slug:name>.xml', sitemaps.serve_sitemap,
+         name='sitemap_section'),
 
     path('profile/<int:post_id>/edit/',
          views.EditProfilView.as_view(), name='edit_profile'),
@@ -43,6 +53,8 @@ urlpatterns = [
 
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/', views.comments_batch,
+         name='comments'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
          views.EditComment.as_view(), name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
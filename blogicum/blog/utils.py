@@ -1,5 +1,32 @@
 """Дополнительные функции"""
-from datetime import datetime
+from contextlib import nullcontext
+from math import ceil
+
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.cache import FEED, bump_feed_version, cache, get_versions
+from blog.images import delete_image
+from blog.models import Category, Comment, Post
+
+NEXT_PUBLICATION_KEY = 'next-publication:{}'
+
+
+def published_q():
+    """Условие публичной видимости поста.
+    Видимость хранится в поле is_visible (см. Post). Посты, время которых
+    наступило, но которые еще не переведены в видимые командой
+    publish_due_posts, отбираются по дате; категория для них проверяется
+    подзапросом, без соединения с категориями. Условие is_published
+    вынесено отдельно, чтобы лента шла по индексу post_published_feed_idx.
+    """
+    return Q(is_published=True) & (Q(is_visible=True) | Q(
+        Exists(Category.objects.filter(
+            pk=OuterRef('category_id'), is_published=True
+        )),
+        pub_date__lte=timezone.now(),
+    ))
 
 
 def sql_filters(sql_req, author=False):
@@ -7,10 +34,88 @@ def sql_filters(sql_req, author=False):
     Фильтры не применяются для автора поста.
     """
     if not author:
-        return sql_req.filter(
-            is_published=True,
-            pub_date__lt=datetime.now(),
-            category__is_published=True
-        )
+        return sql_req.filter(published_q())
     else:
         return sql_req
+
+
+def visible_to(sql_req, user):
+    """Посты, видимые пользователю.
+    Автору дополнительно доступны его неопубликованные посты; проверка
+    авторства выполняется в том же запросе, без отдельной выборки.
+    """
+    if user.is_authenticated:
+        return sql_req.filter(published_q() | Q(author=user))
+    return sql_filters(sql_req)
+
+
+def recount_comments(posts):
+    """Пересчет счетчика comment_count для выбранных постов.
+    Выполняется одним UPDATE с подзапросом, возвращает число строк.
+    """
+    counts = Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post').annotate(total=Count('pk')).values('total')
+    updated = posts.update(
+        comment_count=Coalesce(Subquery(counts), Value(0))
+    )
+    bump_feed_version()
+    return updated
+
+
+def pending_posts():
+    """Опубликованные, но еще не видимые посты в видимых категориях."""
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def next_publication_date():
+    """Дата ближайшего отложенного поста; None, если таких нет."""
+    return pending_posts().filter(
+        pub_date__gte=timezone.now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+def cached_next_publication():
+    """Дата ближайшей отложенной публикации в ISO-формате из кэша.
+    Ключ включает версию лент, а запись истекает к моменту публикации,
+    поэтому значение не устаревает. Пустая строка - отложенных постов нет.
+    """
+    key = NEXT_PUBLICATION_KEY.format(get_versions(FEED))
+    value = cache.get(key)
+    if value is None:
+        next_pub_date = next_publication_date()
+        if next_pub_date is None:
+            value, timeout = '', None
+        else:
+            value = next_pub_date.isoformat()
+            timeout = ceil((next_pub_date - timezone.now()).total_seconds())
+        cache.set(key, value, timeout)
+    return value
+
+
+def seconds_until_next_publication():
+    """Время до появления ближайшего отложенного поста в лентах.
+    None, если отложенных публикаций нет.
+    """
+    next_pub_date = next_publication_date()
+    if next_pub_date is None:
+        return None
+    return max((next_pub_date - timezone.now()).total_seconds(), 0)
+
+
+def collect_orphan_image(name):
+    """Удаление файла изображения, на который не ссылается ни один пост.
+    Возвращает количество освобожденных байтов. Ссылки проверяются под
+    блокировкой хранилища, чтобы save не вернул удаляемый файл.
+    """
+    if not name:
+        return 0
+    storage = Post._meta.get_field('image').storage
+    lock = getattr(storage, 'lock', None)
+    with lock(name) if lock else nullcontext():
+        if Post.objects.filter(image=name).exists():
+            return 0
+        return delete_image(name, storage)
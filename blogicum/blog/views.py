@@ -2,9 +2,11 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
-from django.shortcuts import get_object_or_404, redirect
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
@@ -12,10 +14,15 @@ from blog.models import Category, Post
 from users.forms import UserChangeForm
 
 from .forms import CommentForm, PostForm
-from .mixins import CommentMixin, OnlyAuthorMixin
-from .utils import sql_filters
+from .mixins import (AnonymousPageCacheMixin, CommentMixin,
+                     ConditionalGetMixin, KeysetPaginationMixin,
+                     OnlyAuthorMixin, StreamingImageUploadMixin)
+from .paginators import KeysetPaginator
+from .search import search_posts
+from .utils import sql_filters, visible_to
 
 NUMBER_OF_POSTS_PER_PAGE = 10
+NUMBER_OF_COMMENTS_PER_PAGE = 20
 User = get_user_model()
 
 
@@ -35,6 +42,33 @@ def add_comment(request, post_id):
     return redirect('blog:post_detail', post_id=post_id)
 
 
+def get_comments_page(post, cursor=None):
+    """Страница комментариев поста по ключу (created_at, id)."""
+    return KeysetPaginator(
+        post.comments.select_related('author'),
+        NUMBER_OF_COMMENTS_PER_PAGE,
+        keys=('created_at', 'id'),
+        descending=False
+    ).page(cursor)
+
+
+def comments_batch(request, post_id):
+    """Следующая порция комментариев в виде HTML-фрагмента.
+    Подгружается на странице PostDetail по ссылке "Показать еще".
+    """
+    post = get_object_or_404(visible_to(Post.objects, request.user),
+                             pk=post_id)
+    try:
+        comments = get_comments_page(post, request.GET.get('cursor'))
+    except InvalidPage as error:
+        raise Http404(str(error))
+    return render(request, 'includes/comments.html', {
+        'post': post,
+        'comments': comments,
+        'fragment': True,
+    })
+
+
 class EditComment(CommentMixin, OnlyAuthorMixin, UpdateView):
     """Изменение комментрария."""
 
@@ -48,13 +82,18 @@ class DeleteComment(CommentMixin, OnlyAuthorMixin, DeleteView):
 
 
 def get_post_queryset():
-    """Базовый запрос для постов с нужными select_related и аннотацией."""
+    """Базовый запрос для постов с нужными select_related.
+    Количество комментариев хранится в самом посте (comment_count).
+    """
     return sql_filters(
         Post.objects.select_related('category', 'location', 'author')
-    ).annotate(comment_count=Count("comments"))
+    )
 
 
-class PostListView(ListView):
+class PostListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin,
+    ListView
+):
     """Cтраница с постами."""
 
     paginate_by = NUMBER_OF_POSTS_PER_PAGE
@@ -65,7 +104,7 @@ class PostListView(ListView):
         return get_post_queryset().order_by('-pub_date')
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     """Cтраница с информацией о конкретном посте."""
 
     model = Post
@@ -73,33 +112,50 @@ class PostDetailView(DetailView):
     context_object_name = 'post'
     pk_url_kwarg = 'post_id'
 
+    def get_object(self, queryset=None):
+        """Пост загружается один раз: он нужен уже для валидатора."""
+        if queryset is None and hasattr(self, 'object'):
+            return self.object
+        return super().get_object(queryset)
+
+    def get_validator(self):
+        """Версии поста, его комментариев и связанных записей.
+        Комментарии выбираются и страница рендерится только после проверки
+        валидатора.
+        """
+        post = self.object = self.get_object()
+        return [
+            ('post', post.pk),
+            ('comments', post.pk),
+            ('category', post.category_id),
+            ('location', post.location_id),
+            ('user', post.author_id),
+            ('user', 'all'),
+        ], [post.is_visible]
+
     def get_queryset(self):
         """Запрос к бд с фильрами.
-        Если пользователь и автор профиля страницы совпадают, то пользователь
-        может просматривать неопубликованные посты.
+        Если пользователь и автор поста совпадают, то пользователь может
+        просматривать неопубликованные посты. Публикация и авторство
+        проверяются одним запросом.
         """
-        post_id = self.kwargs[self.pk_url_kwarg]
-        post = get_object_or_404(Post, id=post_id)
-        author = post.author == self.request.user
-        return sql_filters(
-            Post.objects.select_related(
-                'category', 'location', 'author'
-            ).filter(id=post_id),
-            author
-        ).annotate(comment_count=Count("comments"))
+        return visible_to(
+            Post.objects.select_related('category', 'location', 'author'),
+            self.request.user
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related(
-                'author')
-        )
+        context['comments'] = get_comments_page(self.object)
         return context
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin,
+    ListView
+):
     """Cтраница с постами по категории."""
 
     paginate_by = NUMBER_OF_POSTS_PER_PAGE
@@ -124,7 +180,31 @@ class CategoryPostsView(ListView):
         return context
 
 
-class ProfileView(ListView):
+class SearchView(ListView):
+    """Страница поиска по заголовкам и текстам постов.
+    Видимость постов та же, что и в ленте; результаты упорядочены по
+    релевантности.
+    """
+
+    paginate_by = NUMBER_OF_POSTS_PER_PAGE
+    model = Post
+    template_name = 'blog/search.html'
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(get_post_queryset(), self.get_search_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        # Ссылки постраничной навигации сохраняют запрос
+        context['extra_query'] = urlencode({'q': context['query']}) + '&'
+        return context
+
+
+class ProfileView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     """Страница профиля пользователя."""
 
     paginate_by = NUMBER_OF_POSTS_PER_PAGE
@@ -138,8 +218,7 @@ class ProfileView(ListView):
         qs = Post.objects.select_related(
             'category', 'location', 'author'
         ).filter(author__username=self.kwargs['username'])
-        return sql_filters(qs, author).annotate(
-            comment_count=Count("comments")).order_by('-pub_date')
+        return sql_filters(qs, author).order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -173,7 +252,8 @@ class EditProfilView(UserPassesTestMixin, UpdateView):
         return super().dispatch(request, *args, **kwargs)
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(StreamingImageUploadMixin, LoginRequiredMixin,
+                     CreateView):
     """Страница создания поста."""
 
     model = Post
@@ -202,7 +282,8 @@ class AuthorRedirectMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
-class PostUpdateView(AuthorRedirectMixin, OnlyAuthorMixin, UpdateView):
+class PostUpdateView(StreamingImageUploadMixin, AuthorRedirectMixin,
+                     OnlyAuthorMixin, UpdateView):
     """Страница редактирования поста."""
 
     model = Post
@@ -0,0 +1,15 @@
+"""Настройки проекта как приложения."""
+
+
+from django.apps import AppConfig
+
+
+class BlogicumConfig(AppConfig):
+    """Общие для проекта настройки СУБД и проверки боевого профиля."""
+
+    name = 'blogicum'
+    verbose_name = 'Блогикум'
+
+    def ready(self):
+        """Подключение настройки соединений SQLite и проверок --deploy."""
+        from blogicum import checks, db  # noqa: F401
@@ -0,0 +1,83 @@
+"""Бэкенды кэша со счетчиками попаданий и промахов.
+Счетчики накапливаются в процессе и периодически переносятся в сам кэш
+(ключи cache-stats:hits и cache-stats:misses в пространстве имен алиаса),
+поэтому для общих бэкендов (файлы, Redis) их видит команда cache_stats.
+Для locmem статистика действует в пределах одного процесса.
+"""
+from collections import Counter
+from threading import Lock
+
+from django.core.cache.backends import filebased, locmem, redis
+
+STATS_KEYS = {'hits': 'cache-stats:hits', 'misses': 'cache-stats:misses'}
+STATS_FLUSH_EVERY = 100
+_MISSING = object()
+
+
+class CacheStatsMixin:
+    """Подсчет попаданий и промахов для get() и get_many()."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = Counter()
+        self._stats_lock = Lock()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.record_stats(misses=1)
+            return default
+        self.record_stats(hits=1)
+        return value
+
+    def record_stats(self, hits=0, misses=0):
+        with self._stats_lock:
+            self._stats['hits'] += hits
+            self._stats['misses'] += misses
+            pending = sum(self._stats.values())
+        if pending >= STATS_FLUSH_EVERY:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Перенос накопленных счетчиков в кэш."""
+        with self._stats_lock:
+            pending, self._stats = self._stats, Counter()
+        for name, delta in pending.items():
+            if not delta:
+                continue
+            key = STATS_KEYS[name]
+            if not super().add(key, delta, timeout=None, version=0):
+                super().incr(key, delta, version=0)
+
+    def get_stats(self):
+        """Счетчики с учетом еще не перенесенных значений."""
+        self.flush_stats()
+        return {
+            name: super(CacheStatsMixin, self).get(key, 0, version=0)
+            for name, key in STATS_KEYS.items()
+        }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = Counter()
+        super().delete_many(STATS_KEYS.values(), version=0)
+
+
+class LocMemCache(CacheStatsMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(CacheStatsMixin, filebased.FileBasedCache):
+    pass
+
+
+class RedisCache(CacheStatsMixin, redis.RedisCache):
+    """Redis или совместимый по протоколу локальный сервер.
+    Требует пакет redis, который не входит в обязательные зависимости.
+    """
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        self.record_stats(hits=len(found), misses=len(keys) - len(found))
+        return found
@@ -0,0 +1,86 @@
+"""Проверки боевого профиля.
+Запускаются командой manage.py check --deploy и завершают ее с ошибкой, если
+в конфигурации осталась отладочная нагрузка на каждый запрос.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+
+DEBUG_TOOLBAR_APP = 'debug_toolbar'
+DEBUG_TOOLBAR_MIDDLEWARE = 'debug_toolbar.middleware.DebugToolbarMiddleware'
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+DJANGO_TEMPLATES = 'django.template.backends.django.DjangoTemplates'
+
+
+@register('performance', deploy=True)
+def check_debug_overhead(app_configs, **kwargs):
+    """DEBUG и django-debug-toolbar не должны попадать в боевой профиль."""
+    errors = []
+    if settings.DEBUG:
+        errors.append(Error(
+            'DEBUG включен.',
+            hint='Используйте профиль BLOGICUM_SETTINGS=prod.',
+            id='blogicum.E001',
+        ))
+    if (DEBUG_TOOLBAR_APP in settings.INSTALLED_APPS
+            or DEBUG_TOOLBAR_MIDDLEWARE in settings.MIDDLEWARE):
+        errors.append(Error(
+            'django-debug-toolbar подключен и обрабатывает каждый запрос.',
+            hint='Уберите debug_toolbar из INSTALLED_APPS и MIDDLEWARE.',
+            id='blogicum.E002',
+        ))
+    return errors
+
+
+@register('performance', deploy=True)
+def check_template_loaders(app_configs, **kwargs):
+    """Шаблоны должны загружаться через кэширующий загрузчик."""
+    errors = []
+    for engine in settings.TEMPLATES:
+        if engine['BACKEND'] != DJANGO_TEMPLATES:
+            continue
+        options = engine.get('OPTIONS', {})
+        loaders = options.get('loaders')
+        if loaders is None:
+            cached = not options.get('debug', settings.DEBUG)
+        else:
+            first = loaders[0] if loaders else None
+            name = first[0] if isinstance(first, (list, tuple)) else first
+            cached = len(loaders) == 1 and name == CACHED_LOADER
+        if not cached:
+            errors.append(Error(
+                'Шаблоны загружаются без кэширующего загрузчика.',
+                hint=f'Оберните загрузчики в {CACHED_LOADER}.',
+                id='blogicum.E003',
+            ))
+    return errors
+
+
+@register('performance', deploy=True)
+def check_persistent_connections(app_configs, **kwargs):
+    """Соединения с базой данных не должны открываться на каждый запрос."""
+    return [
+        Error(
+            f'База данных {alias!r} открывает соединение на каждый запрос.',
+            hint='Задайте CONN_MAX_AGE больше нуля или включите пул.',
+            id='blogicum.E004',
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get('CONN_MAX_AGE')
+        and 'pool' not in database.get('OPTIONS', {})
+    ]
+
+
+@register('performance', deploy=True)
+def check_static_storage(app_configs, **kwargs):
+    """Статика должна отдаваться с хэшированными именами файлов."""
+    from django.contrib.staticfiles.storage import ManifestFilesMixin
+
+    backend = settings.STORAGES['staticfiles']['BACKEND']
+    if issubclass(import_string(backend), ManifestFilesMixin):
+        return []
+    return [Error(
+        'Статика хранится без манифеста хэшированных имен.',
+        hint='Используйте ManifestStaticFilesStorage.',
+        id='blogicum.E005',
+    )]
@@ -0,0 +1,17 @@
+"""Настройка новых соединений с базой данных.
+Для SQLite включается WAL и остальные PRAGMA из настройки SQLITE_PRAGMAS:
+читатели не блокируют писателя, а конкурирующие записи ждут busy_timeout
+вместо немедленной ошибки "database is locked".
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created, dispatch_uid='blogicum_sqlite_pragmas')
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,162 @@
+"""Отдача медиафайлов.
+Представление проверяет условные заголовки и отвечает 304 без чтения файла.
+Имя файла в хранилище по хэшу содержимого (posts_images/3f/3f9a...c1.jpg)
+уже содержит SHA-256, и ETag по нему строгий; для остальных файлов ETag
+слабый - из времени изменения и размера. Сами байты отдает веб-сервер
+по заголовку X-Sendfile или X-Accel-Redirect (настройка MEDIA_SENDFILE_HEADER),
+а без него - FileResponse через wsgi.file_wrapper. Через Python проходят
+только ответы на запросы с Range.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+# Подкаталог - первые два символа хэша, имя файла - сам хэш
+CONTENT_NAME_RE = re.compile(r'(?:.+/)?([0-9a-f]{2})/(\1[0-9a-f]{62})\.\w+')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+DEFAULT_CACHE_MAX_AGE = 24 * 3600
+
+
+def resolve(path):
+    """Абсолютный путь файла внутри MEDIA_ROOT.
+    Скрытые файлы и каталоги (например, временные файлы загрузок)
+    не отдаются.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+    return full_path, file_stat
+
+
+def file_etag(path, file_stat):
+    """Значение ETag без чтения файла: хэш из имени или метаданные."""
+    match = CONTENT_NAME_RE.fullmatch(path)
+    if match:
+        return f'"{match.group(2)}"'
+    return f'W/"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Диапазон (start, end) включительно.
+    None - заголовок не разобран или задает несколько диапазонов, файл
+    отдается целиком; ValueError - диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if not length or not size:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """If-Range: диапазон отдается, только если файл не изменился."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    # Слабый ETag в If-Range не сравнивается
+    if if_range == etag and not etag.startswith('W/'):
+        return True
+    return if_range == http_date(last_modified)
+
+
+def iter_range(full_path, start, length, block_size=FileResponse.block_size):
+    with open(full_path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(response, header, path, full_path):
+    """Пустой ответ, тело которого подставит веб-сервер."""
+    if header == 'X-Accel-Redirect':
+        response[header] = quote(settings.MEDIA_ACCEL_REDIRECT_PREFIX + path)
+    else:
+        response[header] = full_path
+    return response
+
+
+def range_response(request, response, full_path, size):
+    try:
+        byte_range = parse_range(request.headers['Range'], size)
+    except ValueError:
+        response.status_code = 416
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return None
+    start, end = byte_range
+    length = end - start + 1
+    partial = StreamingHttpResponse(
+        iter_range(full_path, start, length), status=206,
+        headers=response.headers
+    )
+    partial['Content-Range'] = f'bytes {start}-{end}/{size}'
+    partial['Content-Length'] = length
+    return partial
+
+
+@require_safe
+def serve(request, path):
+    full_path, file_stat = resolve(path)
+    etag = file_etag(path, file_stat)
+    last_modified = int(file_stat.st_mtime)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    response = HttpResponse(
+        content_type=content_type or 'application/octet-stream'
+    )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = 'public, max-age={}'.format(getattr(
+        settings, 'MEDIA_CACHE_MAX_AGE', DEFAULT_CACHE_MAX_AGE
+    ))
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+    if conditional is not response:
+        return conditional
+    header = getattr(settings, 'MEDIA_SENDFILE_HEADER', '')
+    if header:
+        return sendfile_response(response, header, path, full_path)
+    if 'Range' in request.headers and range_applies(
+            request, etag, last_modified):
+        partial = range_response(request, response, full_path,
+                                 file_stat.st_size)
+        if partial is not None:
+            return partial
+    if request.method == 'HEAD':
+        response['Content-Length'] = file_stat.st_size
+        return response
+    return FileResponse(open(full_path, 'rb'), headers=response.headers)
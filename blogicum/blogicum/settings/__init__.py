@@ -0,0 +1,18 @@
+"""Настройки проекта.
+Профиль выбирается переменной окружения BLOGICUM_SETTINGS: dev (по
+умолчанию) или prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+PROFILE = os.getenv('BLOGICUM_SETTINGS', 'dev')
+
+if PROFILE == 'dev':
+    from .dev import *  # noqa: F401, F403
+elif PROFILE == 'prod':
+    from .prod import *  # noqa: F401, F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек BLOGICUM_SETTINGS={PROFILE!r}'
+    )
@@ -0,0 +1,249 @@
+"""Общие настройки всех профилей."""
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+SECRET_KEY = os.getenv(
+    'BLOGICUM_SECRET_KEY',
+    'django-insecure-fn41u7c-1z+jwd#dvpeo0m1j-w^s5si#@!*x&4zx-!1!2u@+=h'
+)
+
+DEBUG = False
+
+LOGIN_URL = 'login'
+LOGIN_REDIRECT_URL = 'blog:index'
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+]
+
+CSRF_FAILURE_VIEW = 'pages.views.page_csrf_failure'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+AUTH_USER_MODEL = 'users.MyUser'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
+
+# Передача файлов веб-серверу: X-Sendfile (Apache, lighttpd) или
+# X-Accel-Redirect (nginx, internal location с префиксом ниже). Пустое
+# значение - файлы отдает Django
+MEDIA_SENDFILE_HEADER = os.getenv('BLOGICUM_MEDIA_SENDFILE_HEADER', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 24 * 3600
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'blogicum.apps.BlogicumConfig',
+    'pages.apps.PagesConfig',
+    'blog.apps.BlogConfig',
+    'users.apps.UsersConfig',
+    'django_bootstrap5',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+# База данных: движок выбирается переменной окружения BLOGICUM_DB_ENGINE
+# (sqlite или postgres).
+DATABASE_ENGINE = os.getenv('BLOGICUM_DB_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Запись начинается с блокировки, а не с попытки ее повысить
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+            # Файловая тестовая база: разделяемая in-memory база SQLite
+            # блокирует таблицы целиком и не проверяет работу WAL
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+elif DATABASE_ENGINE == 'postgres':
+    DATABASE_POOL = os.getenv('BLOGICUM_DB_POOL', '') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', 'blogicum'),
+            'USER': os.getenv('BLOGICUM_DB_USER', 'blogicum'),
+            'PASSWORD': os.getenv('BLOGICUM_DB_PASSWORD', ''),
+            'HOST': os.getenv('BLOGICUM_DB_HOST', '127.0.0.1'),
+            'PORT': os.getenv('BLOGICUM_DB_PORT', '5432'),
+            # Пул соединений (psycopg[pool]) несовместим с CONN_MAX_AGE
+            'CONN_MAX_AGE': (
+                0 if DATABASE_POOL
+                else int(os.getenv('BLOGICUM_CONN_MAX_AGE', 60))
+            ),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('BLOGICUM_DB_POOL_MIN', 2)),
+                    'max_size': int(os.getenv('BLOGICUM_DB_POOL_MAX', 10)),
+                },
+            } if DATABASE_POOL else {},
+        }
+    }
+else:
+    raise ValueError(
+        f'Неизвестный движок BLOGICUM_DB_ENGINE={DATABASE_ENGINE!r}'
+    )
+
+# PRAGMA, применяемые к каждому новому соединению SQLite
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Кэш: бэкенд выбирается переменной окружения BLOGICUM_CACHE_BACKEND
+# (locmem, file, redis); у каждого приложения свой алиас и префикс ключей.
+# Хранилища алиасов разделены, чтобы clear() одного алиаса не стирал
+# остальные: в LOCATION подставляются имя алиаса {alias} и его номер {db}
+# (номер базы Redis). BLOGICUM_CACHE_LOCATION задает такой же шаблон.
+CACHE_ALIASES = ('default', 'blog', 'pages', 'users')
+CACHE_BACKENDS = {
+    'locmem': ('blogicum.cache_backends.LocMemCache', 'blogicum-{alias}'),
+    'file': (
+        'blogicum.cache_backends.FileBasedCache',
+        str(BASE_DIR / 'cache' / '{alias}'),
+    ),
+    'redis': (
+        'blogicum.cache_backends.RedisCache', 'redis://127.0.0.1:6379/{db}'
+    ),
+}
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[
+    os.getenv('BLOGICUM_CACHE_BACKEND', 'locmem')
+]
+CACHE_LOCATION = os.getenv('BLOGICUM_CACHE_LOCATION', CACHE_DEFAULT_LOCATION)
+CACHES = {
+    alias: {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION.format(alias=alias, db=db),
+        'KEY_PREFIX': alias,
+        'VERSION': int(os.getenv('BLOGICUM_CACHE_VERSION', 1)),
+        'TIMEOUT': int(os.getenv('BLOGICUM_CACHE_TIMEOUT', 300)),
+    }
+    for db, alias in enumerate(CACHE_ALIASES)
+}
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+LANGUAGE_CODE = 'ru-RU'
+TIME_ZONE = 'UTC'
+USE_I18N = True
+USE_L10N = True
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Изображения постов хранятся под именами из хэша содержимого
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'post_images': {
+        'BACKEND': 'blog.storage.ContentAddressedStorage',
+    },
+}
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
+
+# Постраничная навигация лент по ключу (pub_date, id) вместо OFFSET
+BLOG_KEYSET_PAGINATION = False
+
+# Время жизни кэша страниц лент для анонимных пользователей, секунды
+BLOG_PAGE_CACHE_TIMEOUT = 300
+
+# Количество последних постов в лентах RSS и Atom
+BLOG_FEED_ITEMS = 50
+
+# Каталог файлов карты сайта (команда generate_sitemaps) и адрес сайта
+# для абсолютных ссылок в них
+BLOG_SITEMAP_DIR = BASE_DIR / 'sitemaps'
+BLOG_SITE_URL = os.getenv('BLOGICUM_SITE_URL', 'http://localhost:8000')
+
+# Обрабатывать загруженные изображения прямо в запросе, без воркера
+# process_image_jobs
+BLOG_PROCESS_IMAGES_INLINE = False
+
+# Максимальный размер изображения поста, байты. Файл пишется на диск
+# частями, поэтому лимит не связан с расходом памяти
+BLOG_MAX_IMAGE_SIZE = 5 * 1024 * 1024
+
+# Каталог для загружаемых изображений; должен быть на одной файловой
+# системе с MEDIA_ROOT, чтобы сохранение было переименованием файла
+BLOG_UPLOAD_TEMP_DIR = MEDIA_ROOT / '.uploads'
+
+# Остальные поля форм и файлы других форм держатся в памяти до 2.5 МБ
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2621440
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440
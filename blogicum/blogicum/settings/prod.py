@@ -0,0 +1,39 @@
+"""Боевой профиль: без отладочных инструментов на пути запроса."""
+import os
+from copy import deepcopy
+
+from .base import *  # noqa: F401, F403
+from .base import DATABASES, STORAGES, TEMPLATES
+
+TEMPLATES = deepcopy(TEMPLATES)
+DATABASES = deepcopy(DATABASES)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv(
+    'BLOGICUM_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Шаблоны компилируются один раз на процесс
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Постоянные соединения с базой данных, если не используется пул
+for database in DATABASES.values():
+    if 'pool' in database.get('OPTIONS', {}):
+        continue
+    database['CONN_MAX_AGE'] = int(os.getenv('BLOGICUM_CONN_MAX_AGE', 60))
+    database['CONN_HEALTH_CHECKS'] = True
+
+STORAGES = {
+    **STORAGES,
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
@@ -18,17 +18,18 @@ Including another URLconf
 2)'admin/' - панель администраторв 3) 'pages/' - дополнительные страницы,
 которые переадресовываются в приложении pages; 4) 'auth/' - модуль
 аутентификации. 5) 'auth/registration/' - страница регистрации пользователей.
-Добавлены handler404 и handler500 - адрес view-функции с ошибками. Если включен
-режим отладки, то подключаем toolbar и статику.
+Добавлены handler404 и handler500 - адрес view-функции с ошибками. Медиафайлы
+отдаются представлением blogicum.media.serve, если MEDIA_URL - локальный путь;
+toolbar подключается, если он установлен в профиле настроек.
 """
 
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blogicum.media import serve as serve_media
 from users.forms import UserCreationForm
 
 handler404 = 'pages.views.page_not_found'
@@ -50,9 +51,15 @@ urlpatterns = [
     ),
 ]
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns += (
+        path(
+            settings.MEDIA_URL.lstrip('/') + '<path:path>',
+            serve_media,
+            name='media',
+        ),
     )
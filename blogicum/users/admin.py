@@ -1,16 +1,25 @@
 """Регистрация модели пользователей в админке"""
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Count
 
 from .models import MyUser
 
 
 class MyUserAdmin(UserAdmin):
-    """Кастомный UserAdmin с отображением количества постов."""
+    """Кастомный UserAdmin с отображением количества постов.
+    Количество считается в запросе списка, а не отдельно для каждой строки.
+    """
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            post_count=Count('post')
+        )
 
     def post_count(self, obj):
-        return obj.post_set.count()
+        return obj.post_count
     post_count.short_description = 'Количество постов'
+    post_count.admin_order_field = 'post_count'
 
     list_display = UserAdmin.list_display + ('post_count',)
 
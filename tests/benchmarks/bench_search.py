@@ -0,0 +1,80 @@
+"""Микробенчмарк поиска: индекс основ слов против icontains.
+Запуск:
+
+    pytest tests/benchmarks/bench_search.py
+
+Оба варианта выбирают первую страницу результатов из того же queryset
+ленты. icontains превращается в LIKE '%слово%' по заголовку и тексту всех
+постов; к тому же на SQLite LIKE сравнивает без учета регистра только
+латиницу и не находит другие словоформы. Поиск по индексу - один MATCH по
+заранее посчитанным основам.
+"""
+import pytest
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import reindex_posts, search_posts
+from blog.views import NUMBER_OF_POSTS_PER_PAGE, get_post_queryset
+
+P99_BUDGET_MS = 50
+STEMMED_POSTS = (
+    ("Кошки в городе", "Городские кошки гуляют по крышам."),
+    ("Про кошек", "Заметка о домашних КОШКАХ и их привычках."),
+    ("Котёнок", "Маленькая кошка нашла дом."),
+)
+QUERY = "кошка"
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(scope="module")
+def search_dataset(dataset, django_db_blocker):
+    with django_db_blocker.unblock():
+        Post.objects.bulk_create(
+            Post(
+                title=title, text=text, pub_date=timezone.now(),
+                author=dataset.users[0], category=dataset.categories[0],
+                is_published=True,
+            )
+            for title, text in STEMMED_POSTS
+        )
+        reindex_posts(Post.objects.all())
+    return dataset
+
+
+def _index_page():
+    return list(
+        search_posts(get_post_queryset(), QUERY)[:NUMBER_OF_POSTS_PER_PAGE]
+    )
+
+
+def _icontains_page():
+    return list(
+        get_post_queryset().filter(
+            Q(title__icontains=QUERY) | Q(text__icontains=QUERY)
+        ).order_by("-pub_date")[:NUMBER_OF_POSTS_PER_PAGE]
+    )
+
+
+def test_search_index_vs_icontains(search_dataset, measure, bench_results):
+    indexed = measure("search_index", lambda i: _index_page())
+    naive = measure("search_icontains", lambda i: _icontains_page())
+
+    assert indexed.max_queries == 1
+    assert indexed.p99_ms <= P99_BUDGET_MS, (
+        f"Поиск по индексу: p99 {indexed.p99_ms} мс при бюджете"
+        f" {P99_BUDGET_MS} мс."
+    )
+    found = {post.title for post in _index_page()}
+    assert found >= {title for title, _ in STEMMED_POSTS}, (
+        "Убедитесь, что поиск по индексу находит все словоформы запроса."
+    )
+    missed = {title for title, _ in STEMMED_POSTS} - {
+        post.title for post in _icontains_page()
+    }
+    bench_results["search_index_vs_icontains"] = {
+        "index_p50_ms": indexed.p50_ms,
+        "icontains_p50_ms": naive.p50_ms,
+        "icontains_missed": sorted(missed),
+    }
@@ -0,0 +1,139 @@
+"""Бенчмарки представлений блога.
+Не входят в обычный прогон тестов; запуск:
+
+    pytest tests/benchmarks/bench_views.py
+
+Для каждого сценария измеряются p50/p99 времени ответа, число SQL-запросов
+и пиковая память (tracemalloc); результаты пишутся в JSON (BENCH_OUTPUT),
+чтобы сравнивать их между коммитами. Бюджеты запросов и времени проверяются
+утверждениями.
+"""
+import os
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Post
+
+# Бюджет SQL-запросов не зависит от объема данных
+QUERY_BUDGETS = {
+    "index": 4,
+    "index_deep_page": 4,
+    "index_anonymous": 2,
+    "category": 5,
+    "profile": 5,
+    "detail": 4,
+    "create_post": 6,
+    # Строка полнотекстового индекса перезаписывается одним запросом
+    "edit_post": 11,
+    "delete_post": 8,
+}
+P99_BUDGET_MS = float(os.getenv("BENCH_P99_BUDGET_MS", 500))
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def author_client(dataset):
+    client = Client()
+    client.force_login(dataset.hot_post.author)
+    return client
+
+
+def _check_budget(name, result):
+    assert result.max_queries <= QUERY_BUDGETS[name], (
+        f"Сценарий {name}: {result.max_queries} SQL-запросов при бюджете"
+        f" {QUERY_BUDGETS[name]}."
+    )
+    assert result.p99_ms <= P99_BUDGET_MS, (
+        f"Сценарий {name}: p99 {result.p99_ms} мс при бюджете"
+        f" {P99_BUDGET_MS} мс."
+    )
+
+
+def _get_ok(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, url
+    assert b"djDebug" not in response.content, (
+        f"Ответ {url} содержит панель django-debug-toolbar."
+    )
+    return response
+
+
+@pytest.mark.parametrize(
+    ("name", "url"),
+    [
+        ("index", lambda data: "/"),
+        ("index_deep_page", lambda data: "/?page=last"),
+        ("category", lambda data: (
+            f"/category/{data.categories[0].slug}/"
+        )),
+        ("profile", lambda data: (
+            f"/profile/{data.hot_post.author.username}/"
+        )),
+        ("detail", lambda data: f"/posts/{data.hot_post.id}/"),
+    ],
+)
+def test_read_views(name, url, dataset, author_client, measure):
+    url = url(dataset)
+    _check_budget(name, measure(name, lambda i: _get_ok(author_client, url)))
+
+
+def test_index_anonymous(dataset, client, measure):
+    _check_budget(
+        "index_anonymous",
+        measure("index_anonymous", lambda i: _get_ok(client, "/")),
+    )
+
+
+def _post_form(dataset, i):
+    return {
+        "title": f"Бенчмарк {i}",
+        "text": "Текст публикации",
+        "pub_date": (timezone.now() - timedelta(hours=1)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "category": dataset.categories[0].id,
+    }
+
+
+def test_create_post(dataset, author_client, measure):
+    def run(i):
+        response = author_client.post(
+            "/posts/create/", data=_post_form(dataset, i)
+        )
+        assert response.status_code == HTTPStatus.FOUND
+
+    _check_budget("create_post", measure("create_post", run))
+
+
+def test_edit_post(dataset, author_client, measure):
+    post_id = dataset.hot_post.id
+
+    def run(i):
+        response = author_client.post(
+            f"/posts/{post_id}/edit/", data=_post_form(dataset, i)
+        )
+        assert response.status_code == HTTPStatus.FOUND
+
+    _check_budget("edit_post", measure("edit_post", run))
+
+
+def test_delete_post(dataset, author_client, measure):
+    author = dataset.hot_post.author
+    victims = [
+        Post.objects.create(
+            title=str(i), text=str(i), pub_date=timezone.now(),
+            author=author, category=dataset.categories[0],
+        )
+        for i in range(int(os.getenv("BENCH_ITERATIONS", 20)) + 1)
+    ]
+
+    def run(i):
+        response = author_client.post(f"/posts/{victims[i].id}/delete/")
+        assert response.status_code == HTTPStatus.FOUND
+
+    _check_budget("delete_post", measure("delete_post", run))
@@ -0,0 +1,212 @@
+"""Общие фикстуры бенчмарков.
+Каталог - пакет (benchmarks), поэтому этот conftest не перекрывает модуль
+conftest, из которого импортируют основные тесты. Фикстуры сессии
+регистрируются один раз для всех модулей бенчмарков: набор данных
+создается однажды, а результаты всех сценариев пишутся в один файл
+BENCH_OUTPUT. Данные создаются теми же фабриками mixer, что и в
+tests/fixtures, но без сохранения по одному объекту: объекты собираются в
+контексте commit=False и записываются через bulk_create. Размер набора
+задается переменными окружения BENCH_USERS, BENCH_POSTS, BENCH_COMMENTS.
+Замеры идут с DEBUG=False и без django-debug-toolbar, как в боевом профиле,
+какой бы профиль BLOGICUM_SETTINGS ни был выбран.
+"""
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, modify_settings, override_settings,
+)
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+BENCH_USERS = int(os.getenv("BENCH_USERS", 100))
+BENCH_POSTS = int(os.getenv("BENCH_POSTS", 2000))
+BENCH_COMMENTS = int(os.getenv("BENCH_COMMENTS", 20000))
+BENCH_ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 20))
+BENCH_OUTPUT = Path(os.getenv("BENCH_OUTPUT", "bench_results.json"))
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    users: list
+    categories: list
+    posts: list
+    hot_post: object
+    sizes: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class ScenarioResult:
+    iterations: int
+    p50_ms: float
+    p99_ms: float
+    max_queries: int
+    peak_memory_kib: float
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _bulk(model, objs):
+    for start in range(0, len(objs), BATCH_SIZE):
+        model.objects.bulk_create(objs[start:start + BATCH_SIZE])
+
+
+def _seed() -> Dataset:
+    from blog.models import Category, Comment, Location, Post
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    now = timezone.now()
+    with mixer.ctx(commit=False):
+        _bulk(User, mixer.cycle(BENCH_USERS).blend(User))
+        _bulk(Category, mixer.cycle(10).blend(Category, is_published=True))
+        _bulk(Location, mixer.cycle(10).blend(Location, is_published=True))
+    users = list(User.objects.all())
+    categories = list(Category.objects.all())
+    locations = list(Location.objects.all())
+
+    with mixer.ctx(commit=False):
+        posts = mixer.cycle(BENCH_POSTS).blend(
+            Post,
+            author=mixer.sequence(*users),
+            category=mixer.sequence(*categories),
+            location=mixer.sequence(*locations),
+            is_published=True,
+            image="",
+            pub_date=(
+                now - timedelta(minutes=i) for i in range(1, BENCH_POSTS + 1)
+            ),
+        )
+    _bulk(Post, posts)
+    posts = list(Post.objects.order_by("-pub_date"))
+    hot_post = posts[0]
+
+    with mixer.ctx(commit=False):
+        comments = mixer.cycle(BENCH_COMMENTS).blend(
+            Comment,
+            author=mixer.sequence(*users),
+            # половина комментариев приходится на один популярный пост
+            post=(
+                hot_post if i % 2 else posts[i % len(posts)]
+                for i in range(BENCH_COMMENTS)
+            ),
+        )
+    _bulk(Comment, comments)
+    return Dataset(
+        users=users,
+        categories=categories,
+        posts=posts,
+        hot_post=hot_post,
+        sizes={
+            "users": BENCH_USERS,
+            "posts": BENCH_POSTS,
+            "comments": BENCH_COMMENTS,
+        },
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_settings():
+    """Настройки замеров: отладочные инструменты убраны с пути запроса."""
+    with override_settings(DEBUG=False), modify_settings(
+        INSTALLED_APPS={"remove": "debug_toolbar"},
+        MIDDLEWARE={
+            "remove": "debug_toolbar.middleware.DebugToolbarMiddleware",
+        },
+    ):
+        yield {
+            "profile": settings.PROFILE,
+            "debug": settings.DEBUG,
+            "debug_toolbar": "debug_toolbar" in settings.INSTALLED_APPS,
+        }
+
+
+@pytest.fixture(scope="session")
+def dataset(django_db_setup, django_db_blocker) -> Dataset:
+    with django_db_blocker.unblock():
+        return _seed()
+
+
+@pytest.fixture(scope="session")
+def bench_results(dataset, bench_settings):
+    """Результаты сценариев; кроме ScenarioResult бенчмарк может записать
+    сюда словарь со сравнением вариантов - он сохраняется как есть.
+    """
+    results: Dict[str, Union[ScenarioResult, dict]] = {}
+    yield results
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    BENCH_OUTPUT.write_text(json.dumps(
+        {
+            "commit": commit,
+            "created_at": timezone.now().isoformat(),
+            "settings": bench_settings,
+            "dataset": dataset.sizes,
+            "scenarios": {
+                name: asdict(result) if is_dataclass(result) else result
+                for name, result in results.items()
+            },
+        },
+        ensure_ascii=False,
+        indent=2,
+    ))
+
+
+@contextmanager
+def _measured(timings: List[float], queries: List[int]):
+    with CaptureQueriesContext(connection) as captured:
+        start = time.perf_counter()
+        yield
+        timings.append((time.perf_counter() - start) * 1000)
+    queries.append(len(captured.captured_queries))
+
+
+@pytest.fixture
+def measure(bench_results):
+    """Прогон сценария: run(i) выполняется BENCH_ITERATIONS раз."""
+
+    def _measure(name: str, run: Callable[[int], object],
+                 iterations: int = BENCH_ITERATIONS) -> ScenarioResult:
+        run(-1)  # прогрев: шаблоны, кэши, подготовленные запросы
+        timings: List[float] = []
+        queries: List[int] = []
+        tracemalloc.start()
+        try:
+            for i in range(iterations):
+                with _measured(timings, queries):
+                    run(i)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result = ScenarioResult(
+            iterations=iterations,
+            p50_ms=round(percentile(timings, 50), 3),
+            p99_ms=round(percentile(timings, 99), 3),
+            max_queries=max(queries),
+            peak_memory_kib=round(peak / 1024, 1),
+        )
+        bench_results[name] = result
+        return result
+
+    return _measure
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import EstimatedCountPaginator
+
+
+def _changelist_queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(captured.captured_queries), response
+
+
+@pytest.mark.django_db
+def test_post_changelist_constant_queries(
+        admin_client, mixer, user, published_category, published_location
+):
+    def add_posts(count):
+        mixer.cycle(count).blend(
+            "blog.Post", author=user, category=published_category,
+            location=published_location,
+        )
+
+    add_posts(2)
+    few, _ = _changelist_queries(admin_client, "/admin/blog/post/")
+    add_posts(20)
+    many, response = _changelist_queries(admin_client, "/admin/blog/post/")
+    assert many == few, (
+        "Убедитесь, что список публикаций в админке выполняет одинаковое"
+        " число запросов независимо от количества строк."
+    )
+    rows = response.context["cl"].formset.forms
+    assert all(
+        '<option value="' not in str(form["category"]).replace(
+            f'<option value="{form.instance.category_id}" selected>', ""
+        ).replace('<option value="">', "")
+        for form in rows
+    ), (
+        "Убедитесь, что категория в списке редактируется через"
+        " автодополнение, а не через полный список."
+    )
+
+
+@pytest.mark.django_db
+def test_estimated_count_skips_full_count(
+        mixer, user, published_category, monkeypatch
+):
+    mixer.cycle(5).blend("blog.Post", author=user, category=published_category)
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    monkeypatch.setattr(EstimatedCountPaginator, "threshold", 1)
+
+    paginator = EstimatedCountPaginator(Post.objects.order_by("pk"), 2)
+    with CaptureQueriesContext(connection) as captured:
+        assert paginator.count == 5
+    assert not any(
+        "COUNT(" in query["sql"] for query in captured.captured_queries
+    ), "Убедитесь, что без фильтров количество строк берётся из статистики."
+
+    filtered = EstimatedCountPaginator(
+        Post.objects.filter(pk__lte=Post.objects.order_by("pk")[1].pk), 2
+    )
+    assert filtered.count == 2
+
+
+@pytest.mark.django_db
+def test_user_changelist_constant_queries(admin_client, mixer, user):
+    mixer.cycle(3).blend("blog.Post", author=user)
+    few, _ = _changelist_queries(admin_client, "/admin/users/myuser/")
+    for author in mixer.cycle(10).blend(settings.AUTH_USER_MODEL):
+        mixer.blend("blog.Post", author=author)
+    many, response = _changelist_queries(
+        admin_client, "/admin/users/myuser/?o=6"
+    )
+    assert many == few, (
+        "Убедитесь, что список пользователей в админке выполняет одинаковое"
+        " число запросов независимо от количества строк."
+    )
+    counts = [row.post_count for row in response.context["cl"].result_list]
+    assert counts == sorted(counts) and counts[-1] == 3, (
+        "Убедитесь, что список пользователей сортируется по количеству"
+        " постов."
+    )
@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import override_settings
+
+
+def test_cache_aliases_are_namespaced():
+    blog, pages = caches["blog"], caches["pages"]
+    blog.set("key", "blog")
+    pages.set("key", "pages")
+    assert blog.get("key") == "blog"
+    assert pages.get("key") == "pages"
+
+
+def test_cache_stats_counted():
+    cache = caches["users"]
+    cache.reset_stats()
+    cache.set("present", 1)
+    cache.get("present")
+    cache.get("absent")
+    cache.get_many(["present", "absent"])
+    assert cache.get_stats() == {"hits": 2, "misses": 2}
+
+    out = StringIO()
+    call_command("cache_stats", "users", "--reset", stdout=out)
+    assert "попаданий 2" in out.getvalue()
+    assert cache.get_stats() == {"hits": 0, "misses": 0}
+
+
+@pytest.mark.parametrize("alias", ["blog", "pages"])
+def test_file_backend_stats_shared(tmp_path, alias):
+    caches_setting = {
+        alias: {
+            "BACKEND": "blogicum.cache_backends.FileBasedCache",
+            "LOCATION": str(tmp_path),
+            "KEY_PREFIX": alias,
+        }
+    }
+    with override_settings(CACHES=caches_setting):
+        caches[alias].get("absent")
+        caches[alias].flush_stats()
+        del caches[alias]
+        assert caches[alias].get_stats() == {"hits": 0, "misses": 1}
@@ -0,0 +1,56 @@
+import re
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+from blog.views import NUMBER_OF_COMMENTS_PER_PAGE
+
+N_COMMENTS = NUMBER_OF_COMMENTS_PER_PAGE * 2 + 5
+COMMENT_ANCHOR = re.compile(r'name="comment_(\d+)"')
+NEXT_BATCH = re.compile(r'href="(/posts/\d+/comments/\?cursor=[\w-]+)"')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comments_loaded_in_batches(
+        user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=f"Комментарий {i}")
+        for i in range(N_COMMENTS)
+    )
+    expected = list(
+        Comment.objects.filter(post=post).values_list("id", flat=True)
+    )
+
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    seen = [int(pk) for pk in COMMENT_ANCHOR.findall(content)]
+    assert seen == expected[:NUMBER_OF_COMMENTS_PER_PAGE], (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев."
+    )
+    next_url = NEXT_BATCH.search(content)
+    while next_url:
+        response = user_client.get(next_url.group(1).replace("&amp;", "&"))
+        assert response.status_code == HTTPStatus.OK
+        fragment = response.content.decode()
+        assert "<form" not in fragment and "<html" not in fragment, (
+            "Убедитесь, что следующая порция комментариев отдаётся"
+            " HTML-фрагментом без формы и разметки страницы."
+        )
+        seen.extend(int(pk) for pk in COMMENT_ANCHOR.findall(fragment))
+        next_url = NEXT_BATCH.search(fragment)
+    assert seen == expected, (
+        "Убедитесь, что порции комментариев идут по (created_at, id) без"
+        " пропусков и повторов."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_batch_respects_post_visibility(
+        another_user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
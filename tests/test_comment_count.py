@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+
+def _count(post) -> int:
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert _count(post) == 0
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Ещё"})
+    assert _count(post) == 2, (
+        "Убедитесь, что при добавлении комментария счётчик comment_count"
+        " поста увеличивается."
+    )
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert _count(post) == 1, (
+        "Убедитесь, что при удалении комментария счётчик comment_count"
+        " поста уменьшается."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_count_bulk_paths(user, post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=str(i)) for i in range(5)
+    )
+    assert _count(post) == 5
+    Comment.objects.filter(
+        pk__in=Comment.objects.filter(post=post).values("pk")[:2]
+    ).delete()
+    assert _count(post) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_comment_counts(user, post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=str(i)) for i in range(3)
+    )
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("rebuild_comment_counts", batch_size=1)
+    assert _count(post) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_has_no_comment_aggregation(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/")
+    assert not any(
+        "GROUP BY" in query["sql"] for query in queries.captured_queries
+    ), "Убедитесь, что лента не агрегирует комментарии через GROUP BY."
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from django.test import Client
+
+from blog.models import Comment, Post
+
+N_THREADS = 8
+N_COMMENTS_PER_THREAD = 10
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_applied():
+    if connection.vendor != "sqlite":
+        pytest.skip("PRAGMA применяются только к SQLite.")
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 20000
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1  # NORMAL
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_comment_under_concurrent_writes(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    clients = []
+    for user in mixer.cycle(N_THREADS).blend("users.MyUser"):
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+
+    def hammer(client):
+        try:
+            statuses = [
+                client.post(
+                    f"/posts/{post.id}/comment/", data={"text": str(i)}
+                ).status_code
+                for i in range(N_COMMENTS_PER_THREAD)
+            ]
+        finally:
+            connections.close_all()
+        return statuses
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        results = list(executor.map(hammer, clients))
+
+    expected = N_THREADS * N_COMMENTS_PER_THREAD
+    assert all(
+        status == HTTPStatus.FOUND for statuses in results
+        for status in statuses
+    ), "Убедитесь, что конкурентное добавление комментариев не падает."
+    assert Comment.objects.filter(post=post).count() == expected
+    assert Post.objects.get(pk=post.pk).comment_count == expected, (
+        "Убедитесь, что счётчик комментариев не теряет обновления при"
+        " конкурентной записи."
+    )
@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+@pytest.mark.django_db
+def test_feed_not_modified_without_queries(
+        client, post_with_published_location, django_assert_num_queries
+):
+    first = client.get("/")
+    assert first.has_header("ETag"), "Убедитесь, что лента отдаёт ETag."
+    with django_assert_num_queries(0):
+        second = _revalidate(client, "/", first)
+    assert second.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что при совпадении If-None-Match лента возвращает 304."
+    )
+    assert second["ETag"] == first["ETag"]
+
+    post_with_published_location.title = "Новый заголовок"
+    post_with_published_location.save()
+    assert _revalidate(client, "/", first).status_code == HTTPStatus.OK, (
+        "Убедитесь, что изменение поста меняет ETag ленты."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_etag_follows_deferred_publication(
+        client, mixer, user, published_category
+):
+    pub_date = timezone.now() + timedelta(seconds=1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date,
+    )
+    first = client.get("/")
+    time.sleep((pub_date - timezone.now()).total_seconds() + 0.1)
+    assert _revalidate(client, "/", first).status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag ленты меняется с наступлением отложенной"
+        " публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_detail_etag_per_user_and_comments(
+        client, user_client, post_with_published_location, mixer, user,
+        django_assert_num_queries
+):
+    url = f"/posts/{post_with_published_location.pk}/"
+    anonymous = client.get(url)
+    author = user_client.get(url)
+    assert anonymous["ETag"] != author["ETag"], (
+        "Убедитесь, что ETag страницы поста зависит от пользователя:"
+        " автору видны кнопки редактирования."
+    )
+    with django_assert_num_queries(1):
+        response = _revalidate(client, url, anonymous)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что страница поста возвращает 304 без выборки"
+        " комментариев и рендеринга."
+    )
+    assert _revalidate(client, url, author).status_code == HTTPStatus.OK
+
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    assert _revalidate(client, url, anonymous).status_code == HTTPStatus.OK
+    refreshed = client.get(url)
+    comment.text = "Исправленный комментарий"
+    comment.save()
+    assert _revalidate(client, url, refreshed).status_code == HTTPStatus.OK, (
+        "Убедитесь, что изменение комментария меняет ETag страницы поста."
+    )
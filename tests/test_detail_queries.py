@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_queries_anonymous(
+        client, user, post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=str(i)) for i in range(5)
+    )
+    # пост вместе с проверкой видимости и одна выборка комментариев
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_queries_author(
+        user_client, user, unpublished_posts_with_published_locations,
+        django_assert_num_queries
+):
+    post = unpublished_posts_with_published_locations[0]
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=str(i)) for i in range(5)
+    )
+    # сессия, пользователь, пост и комментарии
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что автор видит свой неопубликованный пост."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_hidden_from_others(
+        another_user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+
+
+def _read(response):
+    assert response.status_code == HTTPStatus.OK
+    if response.streaming:
+        return b"".join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+def _titles(body):
+    root = ElementTree.fromstring(body)
+    return [
+        element.text for element in root.iter()
+        if element.tag.rsplit("}", 1)[-1] == "title"
+    ][1:]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, another_user, published_category):
+    def make(title, **kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", title=title, category=published_category, **kwargs
+        )
+    return {
+        "own": make("Пост автора"),
+        "other": make("Пост другого автора", author=another_user),
+        "hidden": make("Снятый пост", is_published=False),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["", "?format=atom"])
+def test_feeds_list_published_posts(client, feed_posts, user, query):
+    category = feed_posts["own"].category
+    urls = {
+        "/feeds/": {"Пост автора", "Пост другого автора"},
+        f"/category/{category.slug}/feed/": {
+            "Пост автора", "Пост другого автора"
+        },
+        f"/profile/{user.username}/feed/": {"Пост автора"},
+    }
+    for url, expected in urls.items():
+        response = client.get(url + query)
+        assert response.streaming, (
+            "Убедитесь, что лента отдаётся потоковым ответом."
+        )
+        assert set(_titles(_read(response))) == expected, (
+            "Убедитесь, что лента содержит только опубликованные посты"
+            " своей области."
+        )
+
+
+@pytest.mark.django_db
+def test_feed_cached_and_invalidated(
+        client, feed_posts, user, django_assert_num_queries
+):
+    url = f"/profile/{user.username}/feed/"
+    first = client.get(url)
+    body = _read(first)
+    with django_assert_num_queries(1):
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=first["ETag"]
+        ).status_code == HTTPStatus.NOT_MODIFIED
+    with django_assert_num_queries(1):
+        assert _read(client.get(url)) == body, (
+            "Убедитесь, что тело ленты берётся из кэша."
+        )
+
+    feed_posts["other"].title = "Чужое изменение"
+    feed_posts["other"].save()
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=first["ETag"]
+    ).status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что изменение поста вне ленты её не сбрасывает."
+    )
+
+    feed_posts["own"].title = "Новый заголовок"
+    feed_posts["own"].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert "Новый заголовок" in _titles(_read(response)), (
+        "Убедитесь, что изменение поста сбрасывает кэш ленты."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_of_unpublished_category(client, feed_posts):
+    category = feed_posts["own"].category
+    category.is_published = False
+    category.save()
+    response = client.get(f"/category/{category.slug}/feed/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert _titles(_read(client.get("/feeds/"))) == []
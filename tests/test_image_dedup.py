@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import variant_names
+from blog.models import ImageJob, Post
+
+DAY = 24 * 3600
+
+
+def _image(color=(0, 0, 200)) -> ImageFile:
+    buffer = BytesIO()
+    Image.new("RGB", (40, 40), color=color).save(buffer, format="PNG")
+    return ImageFile(buffer, name="photo.png")
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(image):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            image=image,
+        )
+    return make
+
+
+@pytest.mark.django_db(transaction=True)
+def test_same_image_stored_once(make_post):
+    first = make_post(_image())
+    second = make_post(_image())
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в одном файле."
+    )
+    assert ImageJob.objects.count() == 1, (
+        "Убедитесь, что общий файл изображения обрабатывается один раз."
+    )
+    assert Post.objects.get(pk=second.pk).image_variants_ready
+
+
+@pytest.mark.django_db(transaction=True)
+def test_shared_image_deleted_with_last_post(make_post):
+    first = make_post(_image())
+    second = make_post(_image())
+    storage = first.image.storage
+    name = first.image.name
+
+    first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылаются посты."
+    )
+    second.delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что файл без ссылок удаляется вместе с постом."
+    )
+    assert not any(storage.exists(v) for v in variant_names(name))
+
+
+def test_save_waits_for_concurrent_delete():
+    storage = Post._meta.get_field("image").storage
+    name = storage.save("posts_images/photo.png", _image())
+    saved = []
+    with storage.lock(name):
+        thread = threading.Thread(
+            target=lambda: saved.append(
+                storage.save("posts_images/photo.png", _image())
+            )
+        )
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive(), (
+            "Убедитесь, что save ждет блокировку имени файла."
+        )
+        storage.delete(name)
+    thread.join()
+    assert saved == [name]
+    assert storage.exists(name), (
+        "Убедитесь, что файл, удаленный во время save, записывается заново."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replaced_image_collected(make_post):
+    post = Post.objects.get(pk=make_post(_image()).pk)
+    storage = post.image.storage
+    old_name = post.image.name
+    post.image = _image(color=(200, 0, 0))
+    post.save()
+    assert post.image.name != old_name
+    assert not storage.exists(old_name), (
+        "Убедитесь, что замененное изображение удаляется, если на него"
+        " больше нет ссылок."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_collect_command_reports_reclaimed_space(make_post):
+    post = make_post(_image())
+    storage = post.image.storage
+    orphan = storage.overwrite(
+        "posts_images/00/orphan.png", ContentFile(b"x" * 2048)
+    )
+    stale = time.time() - DAY
+    os.utime(storage.path(orphan), (stale, stale))
+
+    out = StringIO()
+    call_command("collect_post_images", stdout=out)
+    assert not storage.exists(orphan)
+    assert storage.exists(post.image.name)
+    assert "освобождено" in out.getvalue(), (
+        "Убедитесь, что команда выводит объём освобождённого места."
+    )
@@ -0,0 +1,85 @@
+from io import BytesIO
+
+import pytest
+from django.core.files import File
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+from blog.models import ImageJob, Post
+from blog.storage import content_hash, content_name
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+def _photo_with_exif() -> ImageFile:
+    img = Image.new("RGB", (120, 60), color=(200, 10, 10))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6  # повернуть на 90° по часовой
+    exif[EXIF_MAKE] = "Camera"
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", exif=exif)
+    return ImageFile(buffer, name="exif_photo.jpg")
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_PROCESS_IMAGES_INLINE=False)
+def test_image_processed_by_worker(
+        mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, image=_photo_with_exif(),
+    )
+    post.refresh_from_db()
+    assert not post.image_variants_ready, (
+        "Убедитесь, что изображение обрабатывается вне запроса."
+    )
+    assert ImageJob.objects.filter(
+        post=post, status=ImageJob.PENDING
+    ).exists()
+
+    call_command("process_image_jobs", "--once")
+
+    post = Post.objects.get(pk=post.pk)
+    assert post.image_variants_ready
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.DONE
+    storage = post.image.storage
+    with storage.open(post.image.name) as file:
+        assert post.image.name == content_name(
+            post.image.name, content_hash(File(file))
+        ), (
+            "Убедитесь, что обработанный оригинал сохраняется под хэшем"
+            " своего содержимого."
+        )
+    assert not storage.exists(job.image_name), (
+        "Убедитесь, что исходный файл с метаданными удаляется после"
+        " обработки."
+    )
+    with default_storage.open(post.image.name) as file, Image.open(file) as img:
+        assert img.size == (60, 120), (
+            "Убедитесь, что изображение поворачивается по EXIF."
+        )
+        assert not img.getexif(), (
+            "Убедитесь, что метаданные EXIF удаляются из изображения."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_PROCESS_IMAGES_INLINE=False)
+def test_failed_job_retried_then_marked(
+        mixer, user, published_category, post_with_published_location
+):
+    post = post_with_published_location
+    job = ImageJob.objects.create(post=post, image_name=post.image.name)
+    default_storage.delete(post.image.name)
+    for _ in range(3):
+        call_command("process_image_jobs", "--once")
+    job.refresh_from_db()
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == 3
+    assert job.error
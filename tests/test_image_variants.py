@@ -0,0 +1,49 @@
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import VARIANT_WIDTHS, variant_name, variant_names
+from blog.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_variants_created_on_upload(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.image_variants_ready, (
+        "Убедитесь, что после загрузки изображения создаются его копии."
+    )
+    for width in VARIANT_WIDTHS:
+        for extension in ("webp", "jpeg"):
+            name = variant_name(post.image.name, width, extension)
+            with default_storage.open(name) as file, Image.open(file) as img:
+                # оригинал 100x100 не увеличивается
+                assert img.width == min(width, 100)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_srcset_rendered(client, post_with_published_location):
+    post = post_with_published_location
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    webp = variant_name(post.image.name, VARIANT_WIDTHS[0], "webp")
+    assert f'{default_storage.url(webp)} {VARIANT_WIDTHS[0]}w' in content, (
+        "Убедитесь, что на странице поста выводится srcset с копиями"
+        " изображения."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_command(post_with_published_location):
+    post = post_with_published_location
+    storage = post.image.storage
+    for name in variant_names(post.image.name):
+        storage.delete(name)
+    Post.objects.filter(pk=post.pk).update(image_variants_name="")
+
+    call_command("generate_image_variants", workers=2)
+
+    post.refresh_from_db()
+    assert post.image_variants_ready
+    assert all(
+        storage.exists(name) for name in variant_names(post.image.name)
+    ), "Убедитесь, что копии создаются в хранилище поля image."
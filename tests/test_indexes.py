@@ -0,0 +1,51 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import CategoryPostsView, PostListView, ProfileView
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="План запроса проверяется только для SQLite.",
+)
+
+
+def _plan(view_class, user=None, **kwargs) -> str:
+    """План запроса ленты из get_queryset() представления."""
+    request = RequestFactory().get("/")
+    request.user = user or AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset().explain()
+
+
+@pytest.mark.django_db
+def test_main_feed_uses_index():
+    plan = _plan(PostListView)
+    assert "post_published_feed_idx" in plan, (
+        "Убедитесь, что лента публикаций использует частичный индекс по"
+        f" pub_date опубликованных постов. План запроса:\n{plan}"
+    )
+
+
+@pytest.mark.django_db
+def test_category_feed_uses_index(published_category):
+    plan = _plan(CategoryPostsView, category_slug=published_category.slug)
+    assert "post_category_feed_idx" in plan, (
+        "Убедитесь, что лента категории использует индекс по"
+        f" (category_id, pub_date). План запроса:\n{plan}"
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("as_author", [False, True])
+def test_profile_feed_uses_index(user, as_author):
+    plan = _plan(
+        ProfileView, user=user if as_author else None,
+        username=user.username,
+    )
+    assert "post_author_feed_idx" in plan, (
+        "Убедитесь, что лента профиля использует индекс по"
+        f" (author_id, pub_date). План запроса:\n{plan}"
+    )
@@ -0,0 +1,94 @@
+import hashlib
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+
+@pytest.fixture
+def image_url(post_with_published_location):
+    return post_with_published_location.image.url
+
+
+@pytest.fixture
+def image_bytes(post_with_published_location):
+    with post_with_published_location.image.open("rb") as file:
+        return file.read()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_media_served_with_strong_etag(client, image_url, image_bytes):
+    response = client.get(image_url)
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == image_bytes
+    assert response["ETag"] == (
+        f'"{hashlib.sha256(image_bytes).hexdigest()}"'
+    ), "Убедитесь, что ETag медиафайла - хэш его содержимого."
+    assert hashlib.sha256(image_bytes).hexdigest() in image_url
+
+    response = client.get(image_url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        image_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_media_range_requests(client, image_url, image_bytes):
+    size = len(image_bytes)
+    response = client.get(image_url, HTTP_RANGE="bytes=0-9")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response["Content-Range"] == f"bytes 0-9/{size}"
+    assert b"".join(response.streaming_content) == image_bytes[:10]
+
+    response = client.get(image_url, HTTP_RANGE="bytes=-5")
+    assert b"".join(response.streaming_content) == image_bytes[-5:]
+
+    response = client.get(image_url, HTTP_RANGE=f"bytes={size}-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+    response = client.get(
+        image_url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что при несовпадении If-Range файл отдаётся целиком."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(MEDIA_SENDFILE_HEADER="X-Accel-Redirect")
+def test_media_offloaded_to_web_server(client, image_url):
+    response = client.get(image_url)
+    assert response["X-Accel-Redirect"].startswith("/protected-media/")
+    assert response.content == b"", (
+        "Убедитесь, что при X-Accel-Redirect тело ответа отдаёт веб-сервер."
+    )
+
+
+@pytest.mark.django_db
+def test_media_weak_etag_for_other_names(client, tmp_path):
+    (tmp_path / "report.txt").write_bytes(b"0123456789")
+    with override_settings(MEDIA_ROOT=tmp_path):
+        response = client.get("/media/report.txt")
+        assert response["ETag"].startswith('W/"'), (
+            "Убедитесь, что для файла с именем не по хэшу содержимого ETag"
+            " слабый и файл не читается целиком."
+        )
+        response = client.get(
+            "/media/report.txt", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = client.get(
+            "/media/report.txt", HTTP_RANGE="bytes=0-4",
+            HTTP_IF_RANGE=response["ETag"],
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            "Убедитесь, что слабый ETag в If-Range не подтверждает диапазон."
+        )
+
+
+@pytest.mark.django_db
+def test_hidden_and_outside_paths_not_served(client):
+    for url in ("/media/.uploads/x.png", "/media/../manage.py"):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.views import PostListView
+
+
+@pytest.mark.django_db(transaction=True)
+def test_anonymous_feed_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries
+):
+    first = client.get("/")
+    with django_assert_num_queries(0):
+        second = client.get("/")
+    assert second.content == first.content, (
+        "Убедитесь, что главная страница для анонимного пользователя"
+        " отдаётся из кэша."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_page_cache_key_normalised(
+        client, post_with_published_location, django_assert_num_queries
+):
+    client.get("/", {"page": "1"})
+    with django_assert_num_queries(0):
+        client.get("/?cursor=&page=1")
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as queries:
+            client.get("/", {"page": "1", "utm_source": "mail"})
+        assert queries.captured_queries, (
+            "Убедитесь, что страницы с посторонними параметрами запроса не"
+            " кэшируются."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_anonymous_feed_invalidated_on_change(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    client.get("/")
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert post.title in client.get("/").content.decode(), (
+        "Убедитесь, что изменение поста сбрасывает кэш страницы ленты."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_page_cache_ttl_capped_by_deferred_post(
+        mixer, user, published_category, settings
+):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 3600
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < PostListView().get_page_cache_timeout() <= 30, (
+        "Убедитесь, что время жизни кэша ленты не превышает времени до"
+        " ближайшей отложенной публикации."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_authenticated_feed_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert user_client.get("/").context is not None, (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
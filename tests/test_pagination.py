@@ -0,0 +1,75 @@
+import base64
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from conftest import N_PER_PAGE
+
+
+def _walk(client, url, cursor_attr):
+    ids, pages, cursor = [], 0, None
+    while True:
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context["page_obj"]
+        ids.extend(post.id for post in page_obj)
+        pages += 1
+        cursor = getattr(page_obj, cursor_attr)
+        if cursor is None:
+            return ids, pages, page_obj
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_whole_feed(
+        user, user_client, many_posts_with_published_locations
+):
+    url = f"/profile/{user.username}/"
+    expected = [
+        post.id for post in sorted(
+            many_posts_with_published_locations,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    ids, pages, last_page = _walk(user_client, url, "next_cursor")
+    assert ids == expected, (
+        "Убедитесь, что при навигации по курсору посты выводятся по убыванию"
+        " (pub_date, id) без пропусков и повторов."
+    )
+    assert pages == -(-len(expected) // N_PER_PAGE)
+
+    response = user_client.get(url, {"cursor": last_page.previous_cursor})
+    assert [post.id for post in response.context["page_obj"]] == (
+        expected[-2 * N_PER_PAGE:-N_PER_PAGE]
+    ), "Убедитесь, что курсор предыдущей страницы возвращает её целиком."
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_skips_count(
+        user, user_client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get(f"/profile/{user.username}/")
+    assert not any(
+        "COUNT(*)" in query["sql"] for query in queries.captured_queries
+    ), "Убедитесь, что при навигации по курсору не выполняется COUNT(*)."
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b"[[null,null],0]").decode(),
+    base64.urlsafe_b64encode(b'[["",""],1]').decode(),
+])
+def test_keyset_pagination_invalid_cursor(user, user_client, cursor):
+    response = user_client.get(
+        f"/profile/{user.username}/", {"cursor": cursor}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что некорректный курсор страницы приводит к ошибке 404."
+    )
@@ -0,0 +1,41 @@
+import pytest
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+
+from blog.templatetags.blog_cache import post_card_version
+
+
+def _card_key(post):
+    post.refresh_from_db()
+    return make_template_fragment_key(
+        "post_card", [post.id, post.comment_count, post_card_version(post)]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_card_is_cached(client, post_with_published_location):
+    post = post_with_published_location
+    client.get("/")
+    assert caches["blog"].get(_card_key(post)) is not None, (
+        "Убедитесь, что карточка поста кэшируется по id поста и его версии."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("related", ["post", "category", "location", "author"])
+def test_post_card_invalidated_on_save(
+        client, post_with_published_location, related
+):
+    post = post_with_published_location
+    client.get("/")
+    key = _card_key(post)
+    instance = post if related == "post" else getattr(post, related)
+    instance.save()
+    assert _card_key(post) != key, (
+        f"Убедитесь, что сохранение `{related}` сбрасывает кэш карточки поста."
+    )
+    new_title = "Новый заголовок"
+    if related == "category":
+        post.category.title = new_title
+        post.category.save()
+        assert new_title in client.get("/").content.decode()
@@ -0,0 +1,91 @@
+import gzip
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import sitemaps
+from blog.models import Post
+from blog.publishing import (post_published, publish_due_posts,
+                             seconds_until_due)
+
+
+@pytest.fixture
+def deferred_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30),
+    )
+
+
+@pytest.mark.django_db
+def test_post_published_signal_sent_once(deferred_post):
+    received = []
+
+    def receiver(sender, instance, **kwargs):
+        received.append(instance.pk)
+
+    post_published.connect(receiver, sender=Post)
+    try:
+        publish_due_posts()
+        assert received == [], (
+            "Убедитесь, что пост не публикуется раньше своей даты."
+        )
+        publish_due_posts(now=deferred_post.pub_date)
+        publish_due_posts(now=deferred_post.pub_date)
+    finally:
+        post_published.disconnect(receiver, sender=Post)
+    assert received == [deferred_post.pk], (
+        "Убедитесь, что при публикации отложенного поста сигнал"
+        " post_published отправляется ровно один раз."
+    )
+
+
+@pytest.mark.django_db
+def test_publisher_sleeps_until_next_post(deferred_post):
+    assert 0 < seconds_until_due(max_sleep=60) <= 30, (
+        "Убедитесь, что воркер просыпается к дате ближайшей публикации."
+    )
+    assert seconds_until_due(max_sleep=5) == 5
+    Post.objects.filter(pk=deferred_post.pk).update(is_published=False)
+    assert seconds_until_due(max_sleep=60) == 60
+
+
+@pytest.mark.django_db(transaction=True)
+def test_published_post_added_to_sitemap(
+        deferred_post, settings, tmp_path
+):
+    settings.BLOG_SITEMAP_DIR = tmp_path
+    call_command("generate_sitemaps", stdout=StringIO())
+    publish_due_posts(now=deferred_post.pub_date)
+    with gzip.open(tmp_path / "posts-0001.xml.gz", "rt") as file:
+        assert f"/posts/{deferred_post.pk}/" in file.read(), (
+            "Убедитесь, что опубликованный пост сразу попадает в карту"
+            " сайта."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sitemaps_updated_once_per_batch(
+        mixer, user, published_category, settings, tmp_path, monkeypatch
+):
+    settings.BLOG_SITEMAP_DIR = tmp_path
+    call_command("generate_sitemaps", stdout=StringIO())
+    due = timezone.now() + timedelta(seconds=30)
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=due,
+    )
+    calls = []
+    generate = sitemaps.generate_sitemaps
+    monkeypatch.setattr(
+        sitemaps, "generate_sitemaps",
+        lambda: calls.append(1) or generate(),
+    )
+    assert len(publish_due_posts(now=due)) == 3
+    assert len(calls) == 1, (
+        "Убедитесь, что карта сайта обновляется один раз на пачку"
+        " опубликованных постов."
+    )
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.models import Post
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    def make(title, text, **kwargs):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+    return {
+        "title": make("Кошки и собаки", "Обычный текст."),
+        "text": make("Заметка", "Сегодня видел кошки во дворе."),
+        "other": make("Погода", "Дождь весь день."),
+        "hidden": make("Кошки тайно", "Скрыто.", is_published=False),
+    }
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_filters(client, search_posts):
+    response = client.get("/search/", {"q": "кошки"})
+    assert response.status_code == HTTPStatus.OK
+    found = [post.pk for post in response.context["page_obj"]]
+    assert found == [search_posts["title"].pk, search_posts["text"].pk], (
+        "Убедитесь, что поиск находит посты по заголовку и тексту,"
+        " ставит совпадения в заголовке выше и скрывает неопубликованные"
+        " посты."
+    )
+    assert "<mark>Кошки</mark>" in response.content.decode(), (
+        "Убедитесь, что совпадения в результатах поиска подсвечиваются."
+    )
+
+
+@pytest.mark.django_db
+def test_admin_search_keeps_rank_order(admin_client, search_posts):
+    Post.objects.filter(pk=search_posts["text"].pk).update(
+        pub_date=search_posts["title"].pub_date + timedelta(days=1)
+    )
+    response = admin_client.get("/admin/blog/post/", {"q": "кошки"})
+    assert response.status_code == HTTPStatus.OK
+    expected = [search_posts["title"].pk, search_posts["text"].pk]
+    found = [
+        post.pk for post in response.context["cl"].result_list
+        if post.pk in expected
+    ]
+    assert found == expected, (
+        "Убедитесь, что поиск в админке выводит посты по релевантности,"
+        " а не по дате."
+    )
+    response = admin_client.get(
+        "/admin/blog/post/", {"q": "кошки", "o": "-4"}
+    )
+    found = [
+        post.pk for post in response.context["cl"].result_list
+        if post.pk in expected
+    ]
+    assert found == expected[::-1], (
+        "Убедитесь, что при поиске в админке работает сортировка по"
+        " выбранному столбцу."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_edits(client, search_posts):
+    post = search_posts["other"]
+    post.title = "Кошки <b>под</b> дождём"
+    post.save()
+    response = client.get("/search/", {"q": "кошк"})
+    assert post in response.context["page_obj"]
+    assert "&lt;b&gt;под&lt;/b&gt;" in response.content.decode(), (
+        "Убедитесь, что текст поста в выдаче экранируется."
+    )
+
+    post.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM blog_post_search WHERE rowid = %s",
+            [post.pk],
+        )
+        assert cursor.fetchone()[0] == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(client, search_posts):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_search")
+    Post.objects.filter(pk=search_posts["other"].pk).update(title="Кошки")
+
+    out = StringIO()
+    call_command("rebuild_search_index", batch_size=2, stdout=out)
+    assert f"Проиндексировано постов: {len(search_posts)}" in out.getvalue()
+    response = client.get("/search/", {"q": "кошки"})
+    assert search_posts["other"] in response.context["page_obj"]
+
+
+@pytest.mark.django_db
+def test_empty_query(client, search_posts):
+    response = client.get("/search/", {"q": '" * AND'})
+    assert response.status_code == HTTPStatus.OK
+    assert not response.context["page_obj"]
+
+
+@pytest.mark.django_db
+def test_search_matches_word_forms(client, search_posts):
+    search_posts["other"].text = "Ёлка стояла в углу."
+    search_posts["other"].save()
+    for query, post in (("кошками", "title"), ("ЕЛКИ", "other")):
+        response = client.get("/search/", {"q": query})
+        assert search_posts[post] in response.context["page_obj"], (
+            "Убедитесь, что поиск учитывает словоформы, регистр и букву ё."
+        )
+    response = client.get("/search/", {"q": "кошками"})
+    assert "<mark>Кошки</mark>" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_search_by_category_title(client, search_posts, published_category):
+    published_category.title = "Путешествия"
+    published_category.save()
+    response = client.get("/search/", {"q": "путешествие"})
+    assert set(response.context["page_obj"]) == {
+        search_posts["title"], search_posts["text"], search_posts["other"]
+    }, (
+        "Убедитесь, что посты находятся по названию категории и индекс"
+        " обновляется при его изменении."
+    )
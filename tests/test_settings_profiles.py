@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+
+
+def _deploy_check(profile: str) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "BLOGICUM_SETTINGS": profile,
+        "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+    }
+    return subprocess.run(
+        [sys.executable, "manage.py", "check", "--deploy",
+         "--tag", "performance"],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+
+
+def test_prod_profile_passes_performance_checks():
+    result = _deploy_check("prod")
+    assert result.returncode == 0, (
+        "Убедитесь, что профиль prod не содержит отладочной нагрузки:\n"
+        f"{result.stderr}"
+    )
+
+
+@pytest.mark.parametrize("error_id", [
+    "blogicum.E001", "blogicum.E002", "blogicum.E003", "blogicum.E004",
+    "blogicum.E005",
+])
+def test_dev_profile_fails_performance_checks(error_id):
+    result = _deploy_check("dev")
+    assert result.returncode != 0
+    assert error_id in result.stderr
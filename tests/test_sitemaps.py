@@ -0,0 +1,148 @@
+import gzip
+import re
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import sitemaps
+from blog.models import Post
+
+
+@pytest.fixture
+def sitemap_settings(settings, tmp_path, monkeypatch):
+    settings.BLOG_SITEMAP_DIR = tmp_path
+    settings.BLOG_SITE_URL = "https://blog.example"
+    monkeypatch.setattr(sitemaps, "MAX_URLS", 2)
+    monkeypatch.setattr(sitemaps, "BATCH_SIZE", 1)
+    return tmp_path
+
+
+def _make_posts(mixer, user, category, count, **kwargs):
+    return mixer.cycle(count).blend(
+        "blog.Post", author=user, category=category, is_published=True,
+        pub_date=(timezone.now() - timedelta(days=day) for day in range(
+            count, 0, -1)),
+        **kwargs
+    )
+
+
+def _locations(path):
+    with gzip.open(path, "rt") as file:
+        return re.findall(r"<loc>([^<]+)</loc>", file.read())
+
+
+@pytest.mark.django_db
+def test_sitemaps_sharded_and_incremental(
+        sitemap_settings, mixer, user, published_category
+):
+    posts = _make_posts(mixer, user, published_category, 3)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    call_command("generate_sitemaps", stdout=StringIO())
+    assert _locations(sitemap_settings / "posts-0001.xml.gz") == [
+        f"https://blog.example/posts/{post.pk}/" for post in posts[:2]
+    ], "Убедитесь, что в файле карты сайта не больше MAX_URLS адресов."
+    index = _locations(sitemap_settings / "sitemap.xml.gz")
+    assert "https://blog.example/sitemaps/posts-0002.xml" in index
+    assert "https://blog.example/sitemaps/categories-0001.xml" in index
+    assert "https://blog.example/sitemaps/profiles-0001.xml" in index
+
+    first_shard = sitemap_settings / "posts-0001.xml.gz"
+    mtime = first_shard.stat().st_mtime_ns
+    new_post, = _make_posts(mixer, user, published_category, 1)
+    out = StringIO()
+    call_command("generate_sitemaps", stdout=out)
+    assert "posts - 1" in out.getvalue(), (
+        "Убедитесь, что повторный запуск дописывает только новые посты."
+    )
+    assert first_shard.stat().st_mtime_ns == mtime, (
+        "Убедитесь, что заполненные файлы карты сайта не перезаписываются."
+    )
+    assert _locations(sitemap_settings / "posts-0002.xml.gz") == [
+        f"https://blog.example/posts/{posts[2].pk}/",
+        f"https://blog.example/posts/{new_post.pk}/",
+    ]
+
+
+@pytest.mark.django_db
+def test_full_rebuild_drops_hidden(
+        sitemap_settings, mixer, user, published_category
+):
+    posts = _make_posts(mixer, user, published_category, 3)
+    call_command("generate_sitemaps", stdout=StringIO())
+    posts[0].is_published = False
+    posts[0].save()
+    call_command("generate_sitemaps", full=True, stdout=StringIO())
+    assert _locations(sitemap_settings / "posts-0001.xml.gz") == [
+        f"https://blog.example/posts/{post.pk}/" for post in posts[1:]
+    ]
+    assert not (sitemap_settings / "posts-0002.xml.gz").exists(), (
+        "Убедитесь, что лишние файлы удаляются при полной перегенерации."
+    )
+
+
+@pytest.mark.django_db
+def test_late_visible_posts_rewrite_shards(
+        sitemap_settings, mixer, user, published_category
+):
+    posts = _make_posts(mixer, user, published_category, 4)
+    hidden = mixer.blend("blog.Category", is_published=False)
+    late = mixer.blend(
+        "blog.Post", author=user, category=hidden, is_published=True,
+        pub_date=posts[2].pub_date + timedelta(hours=1),
+    )
+    call_command("generate_sitemaps", stdout=StringIO())
+    first_shard = sitemap_settings / "posts-0001.xml.gz"
+    mtime = first_shard.stat().st_mtime_ns
+
+    hidden.is_published = True
+    hidden.save()
+    call_command("generate_sitemaps", stdout=StringIO())
+    assert _locations(sitemap_settings / "posts-0002.xml.gz") == [
+        f"https://blog.example/posts/{post.pk}/"
+        for post in (posts[2], late)
+    ], (
+        "Убедитесь, что пост, ставший видимым с более ранней датой"
+        " публикации, попадает в карту сайта без полной перегенерации."
+    )
+    assert _locations(sitemap_settings / "posts-0003.xml.gz") == [
+        f"https://blog.example/posts/{posts[3].pk}/"
+    ]
+    assert first_shard.stat().st_mtime_ns == mtime, (
+        "Убедитесь, что файлы до изменившегося не перезаписываются."
+    )
+
+    Post.objects.filter(pk=late.pk).update(is_published=False)
+    call_command("generate_sitemaps", stdout=StringIO())
+    assert _locations(sitemap_settings / "posts-0002.xml.gz") == [
+        f"https://blog.example/posts/{post.pk}/" for post in posts[2:]
+    ]
+    assert not (sitemap_settings / "posts-0003.xml.gz").exists()
+
+
+@pytest.mark.django_db
+def test_sitemap_served_gzipped(
+        client, sitemap_settings, mixer, user, published_category
+):
+    assert client.get("/sitemap.xml").status_code == HTTPStatus.NOT_FOUND
+    _make_posts(mixer, user, published_category, 1)
+    call_command("generate_sitemaps", stdout=StringIO())
+
+    response = client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    body = gzip.decompress(b"".join(response.streaming_content))
+    assert b"<sitemapindex" in body, (
+        "Убедитесь, что индекс карты сайта отдаётся сжатым."
+    )
+    plain = client.get("/sitemaps/posts-0001.xml")
+    assert not plain.has_header("Content-Encoding")
+    assert b"<urlset" in b"".join(plain.streaming_content)
+    assert client.get(
+        "/sitemap.xml", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,93 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from PIL import Image
+
+from blog.models import Post
+
+
+def _png() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (50, 50), color=(10, 200, 10)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _post_data(category, image):
+    return {
+        "title": "Пост с картинкой",
+        "text": "Текст",
+        "pub_date": "2020-01-01T12:00",
+        "category": category.id,
+        "image": image,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_PROCESS_IMAGES_INLINE=False)
+def test_image_streamed_with_hash(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    content = _png()
+    response = client.get("/posts/create/")
+    data = _post_data(
+        published_category,
+        SimpleUploadedFile("pic.png", content, content_type="image/png"),
+    )
+    data["csrfmiddlewaretoken"] = response.context["csrf_token"]
+    response = client.post("/posts/create/", data=data)
+    post = Post.objects.get(title="Пост с картинкой")
+    with post.image.open("rb") as file:
+        assert hashlib.sha256(file.read()).hexdigest() == (
+            hashlib.sha256(content).hexdigest()
+        )
+    temp_dir = settings.BLOG_UPLOAD_TEMP_DIR
+    assert not os.listdir(temp_dir), (
+        "Убедитесь, что временный файл загрузки перемещается в хранилище."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_without_csrf_rejected(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    image = SimpleUploadedFile("pic.png", _png(), content_type="image/png")
+    response = client.post(
+        "/posts/create/", data=_post_data(published_category, image)
+    )
+    assert response.status_code == 403, (
+        "Убедитесь, что потоковая загрузка не отключает проверку CSRF."
+    )
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_MAX_IMAGE_SIZE=1024)
+def test_oversized_image_rejected(user_client, published_category):
+    image = SimpleUploadedFile(
+        "big.png", _png() + b"\0" * 4096, content_type="image/png"
+    )
+    response = user_client.post(
+        "/posts/create/", data=_post_data(published_category, image)
+    )
+    assert not Post.objects.exists()
+    assert "Размер файла больше" in response.content.decode(), (
+        "Убедитесь, что при превышении размера изображения форма"
+        " показывает ошибку."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_non_image_rejected_by_signature(user_client, published_category):
+    fake = SimpleUploadedFile(
+        "fake.png", b"#!/bin/sh\necho hi\n", content_type="image/png"
+    )
+    response = user_client.post(
+        "/posts/create/", data=_post_data(published_category, fake)
+    )
+    assert not Post.objects.exists()
+    assert "Файл не является изображением." in response.content.decode()
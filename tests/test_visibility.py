@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.publishing import publish_due_posts
+from blog.views import get_post_queryset
+
+
+def _visible(*posts):
+    return [
+        Post.objects.get(pk=post.pk).is_visible for post in posts
+    ]
+
+
+@pytest.mark.django_db
+def test_public_filter_without_category_join():
+    sql = str(
+        get_post_queryset().select_related(None).only("id").query
+    )
+    assert "is_visible" in sql and "JOIN" not in sql, (
+        "Убедитесь, что публичные запросы фильтруют посты по полю"
+        " is_visible без соединения с категориями."
+    )
+
+
+@pytest.mark.django_db
+def test_due_post_visible_before_tick(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    assert get_post_queryset().filter(pk=post.pk).exists(), (
+        "Убедитесь, что пост, время публикации которого наступило, виден"
+        " в лентах до запуска publish_due_posts."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert not get_post_queryset().filter(pk=post.pk).exists()
+
+
+@pytest.mark.django_db
+def test_category_publication_flips_posts(
+        mixer, user, published_category, client
+):
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert _visible(*posts) == [True, True]
+    published_category.is_published = False
+    published_category.save()
+    assert _visible(*posts) == [False, False], (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+    assert not client.get("/").context["page_obj"]
+    published_category.is_published = True
+    published_category.save()
+    assert _visible(*posts) == [True, True]
+
+    Post.objects.filter(pk=posts[0].pk).update(is_published=False)
+    assert _visible(*posts) == [False, True], (
+        "Убедитесь, что update() пересчитывает флаг видимости."
+    )
+
+
+@pytest.mark.django_db
+def test_category_queryset_update_flips_posts(
+        mixer, user, published_category, client
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert client.get("/").context["page_obj"]
+    Category.objects.filter(is_published=True).update(is_published=False)
+    assert _visible(post) == [False], (
+        "Убедитесь, что update() категорий пересчитывает видимость их постов."
+    )
+    assert not client.get("/").context["page_obj"], (
+        "Убедитесь, что после update() категорий кэш ленты сбрасывается."
+    )
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=True
+    )
+    assert _visible(post) == [True]
+
+
+@pytest.mark.django_db
+def test_update_sets_visibility_in_one_query(
+        mixer, user, published_category, django_assert_num_queries
+):
+    hidden = mixer.blend("blog.Category", is_published=False)
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    queryset = Post.objects.filter(pk__in=[post.pk for post in posts])
+    with django_assert_num_queries(1):
+        queryset.update(category=hidden)
+    assert _visible(*posts) == [False, False], (
+        "Убедитесь, что update() вычисляет is_visible в том же запросе."
+    )
+    queryset.update(category_id=published_category.pk)
+    assert _visible(*posts) == [True, True]
+    queryset.filter(pk=posts[0].pk).update(
+        pub_date=timezone.now() + timedelta(hours=1)
+    )
+    assert _visible(*posts) == [False, True]
+    queryset.update(category=None)
+    assert _visible(*posts) == [False, False]
+
+
+@pytest.mark.django_db
+def test_bulk_create_sets_visibility(user, published_category):
+    now = timezone.now()
+    created = Post.objects.bulk_create(
+        Post(
+            title="Пост", text="Текст", author=user,
+            category=published_category, pub_date=pub_date,
+        )
+        for pub_date in (now - timedelta(hours=1), now + timedelta(hours=1))
+    )
+    assert [post.is_visible for post in created] == [True, False]
+
+
+@pytest.mark.django_db
+def test_deferred_post_promoted_by_tick(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date,
+    )
+    out = StringIO()
+    call_command("publish_due_posts", stdout=out)
+    assert "Опубликовано постов: 0" in out.getvalue()
+    assert _visible(post) == [False]
+
+    assert publish_due_posts(now=pub_date) == [post.pk]
+    assert _visible(post) == [True], (
+        "Убедитесь, что отложенный пост становится видимым, когда"
+        " наступает дата публикации."
+    )
+    assert publish_due_posts(now=pub_date) == []